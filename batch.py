@@ -0,0 +1,208 @@
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import main  # noqa: E402
+
+WIDTH, HEIGHT = 1280, 720
+MAX_TICKS = main.GameSimulation.TICK_RATE * 60 * 10
+END_STATES = {main.GameSimulation.WIN: "win",
+              main.GameSimulation.LOSE: "lose",
+              None: "timeout"}
+LEVEL_CONSTANTS = {"Bonus.N_BLOCKS_FOR_GET_INCR_PLATFORM":
+                   "incr_platform_blocks",
+                   "Block.WIDTH": "block_width",
+                   "Block.HEIGHT": "block_height",
+                   "Block.INDENT": "indent"}
+
+
+class TrackingController:
+    DEAD_ZONE = 5
+
+    def __init__(self, seed):
+        self.random = random.Random(seed)
+        self.offset = 0
+
+    def __call__(self, simulation):
+        ball = simulation.balls.get_primary()
+        if ball.static_state():
+            return 1
+        paddle = simulation.paddle
+        if ball.get_y_direction() < 0:
+            half_width = paddle.get_width() // 2
+            self.offset = self.random.randint(-half_width, half_width)
+        ball_x = ball.rect.centerx - self.offset
+        paddle_x = paddle.rect.centerx
+        if ball_x > paddle_x + self.DEAD_ZONE:
+            return 1
+        if ball_x < paddle_x - self.DEAD_ZONE:
+            return -1
+        return 0
+
+
+class RandomController:
+    HOLD_TICKS = 15
+
+    def __init__(self, seed):
+        self.random = random.Random(seed)
+        self.direction = 1
+
+    def __call__(self, simulation):
+        if simulation.ticks % self.HOLD_TICKS == 0:
+            self.direction = self.random.choice((-1, 0, 1))
+        return self.direction
+
+
+CONTROLLERS = {"tracking": TrackingController, "random": RandomController}
+
+
+def load_controller(spec):
+    if spec in CONTROLLERS:
+        return CONTROLLERS[spec]
+    module_name, _, name = spec.partition(":")
+    return getattr(importlib.import_module(module_name), name)
+
+
+def parse_setting(text):
+    name, _, value = text.partition("=")
+    target, _, attribute = name.partition(".")
+    if not attribute or not value:
+        raise argparse.ArgumentTypeError(
+            f"expected Class.ATTRIBUTE=VALUE, got {text!r}")
+    if name in LEVEL_CONSTANTS:
+        target, attribute = "level", LEVEL_CONSTANTS[name]
+    if target == "level":
+        if attribute not in main.Level.SETTINGS:
+            raise argparse.ArgumentTypeError(
+                f"unknown level setting {attribute!r}")
+    elif not hasattr(getattr(main, target, None), attribute):
+        raise argparse.ArgumentTypeError(f"unknown setting {name!r}")
+    try:
+        value = json.loads(value)
+    except ValueError:
+        pass
+    return target, attribute, value
+
+
+def apply_settings(settings):
+    for target, attribute, value in settings:
+        if target != "level":
+            setattr(getattr(main, target), attribute, value)
+
+
+def new_level(level_path, settings):
+    level = main.Level.load(level_path).copy() if level_path else \
+        main.Level.default()
+    for target, attribute, value in settings:
+        if target == "level":
+            setattr(level, attribute, value)
+    level.validate()
+    return level
+
+
+def run_game(task):
+    index, seed, controller_spec, settings, level_path, max_ticks = task
+    apply_settings(settings)
+    simulation = main.GameSimulation(WIDTH, HEIGHT, seed,
+                                     new_level(level_path, settings))
+    controller = load_controller(controller_spec)(seed)
+    while not simulation.is_finished() and simulation.ticks < max_ticks:
+        simulation.step(controller(simulation))
+    is_won = simulation.end_state == main.GameSimulation.WIN
+    return {"game": index,
+            "seed": seed,
+            "end_state": END_STATES[simulation.end_state],
+            "score": simulation.score.get_score(),
+            "lives": simulation.balls.get_lifes(),
+            "ticks": simulation.ticks,
+            "frames_to_clear": simulation.ticks if is_won else None}
+
+
+def mean(values):
+    return statistics.mean(values) if values else None
+
+
+def aggregate(results):
+    frames_to_clear = [result["frames_to_clear"] for result in results
+                       if result["frames_to_clear"] is not None]
+    summary = {"games": len(results)}
+    for key, state in (("wins", "win"), ("losses", "lose"),
+                       ("timeouts", "timeout")):
+        summary[key] = sum(result["end_state"] == state for result in results)
+    summary["win_rate"] = summary["wins"] / len(results) if results else None
+    summary["mean_score"] = mean([result["score"] for result in results])
+    summary["mean_lives"] = mean([result["lives"] for result in results])
+    summary["mean_frames_to_clear"] = mean(frames_to_clear)
+    return summary
+
+
+def run_batch(games, controller, settings=(), level_path=None, seed=0,
+              max_ticks=MAX_TICKS, jobs=None, output=None):
+    tasks = [(index, seed + index, controller, settings, level_path,
+              max_ticks) for index in range(games)]
+    results = []
+    with multiprocessing.Pool(jobs) as pool:
+        for result in pool.imap_unordered(run_game, tasks):
+            results.append(result)
+            if output is not None:
+                output.write(json.dumps(result) + "\n")
+                output.flush()
+    return aggregate(results)
+
+
+def main_batch():
+    parser = argparse.ArgumentParser(
+        description="Run headless Arkanoid games in parallel")
+    parser.add_argument("--games", type=int, default=100,
+                        help="number of games to play (default: 100)")
+    parser.add_argument("--controller", default="tracking",
+                        help="paddle controller: {} or module:name of a "
+                             "class taking the game seed whose instances "
+                             "return -1, 0 or 1 for a simulation "
+                             "(default: tracking)".format(
+                                 ", ".join(CONTROLLERS)))
+    parser.add_argument("--set", dest="settings", metavar="NAME=VALUE",
+                        type=parse_setting, action="append", default=[],
+                        help="override a class constant such as "
+                             "Ball.SPEED=7 or a level setting such as "
+                             "level.incr_platform_blocks=10; block sizes "
+                             "and the platform bonus threshold are applied "
+                             "to the level")
+    parser.add_argument("--level", metavar="PATH",
+                        help="text or compiled level file")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed of the first game (default: 0)")
+    parser.add_argument("--max-ticks", type=int, default=MAX_TICKS,
+                        help="ticks before a game is stopped as a timeout "
+                             "(default: {})".format(MAX_TICKS))
+    parser.add_argument("--jobs", type=int,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--output", metavar="PATH",
+                        help="stream per-game results to PATH as JSON lines")
+    args = parser.parse_args()
+
+    load_controller(args.controller)
+    level_path = os.path.abspath(args.level) if args.level else None
+    output = open(args.output, "w") if args.output else None
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        summary = run_batch(args.games, args.controller, args.settings,
+                            level_path, args.seed, args.max_ticks, args.jobs,
+                            output)
+    finally:
+        if output is not None:
+            output.close()
+    json.dump(summary, sys.stdout, indent=4)
+    print()
+
+
+if __name__ == "__main__":
+    main_batch()
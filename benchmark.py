@@ -0,0 +1,180 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame  # noqa: E402
+
+import main  # noqa: E402
+
+WIDTH, HEIGHT = 1280, 720
+SEED = 0
+REPEAT = 5
+BLOCK_COUNTS = (144, 1000, 4000)
+BALL_COUNTS = (1, 10, 100, 500)
+STEPS = 200
+
+
+def measure(func, number=1, repeat=REPEAT, setup=None):
+    timings = []
+    for _ in range(repeat):
+        state = setup() if setup is not None else None
+        start = time.perf_counter()
+        for _ in range(number):
+            func(state)
+        timings.append((time.perf_counter() - start) / number)
+    return statistics.median(timings)
+
+
+def new_simulation():
+    return main.GameSimulation(WIDTH, HEIGHT, SEED)
+
+
+def catch_all_paddle(simulation):
+    simulation.paddle.set_width(WIDTH)
+    simulation.paddle.set_pos(0, simulation.paddle.get_pos()[1])
+
+
+def dense_blocks(simulation, count):
+    columns = max(1, int((count * 2 * WIDTH / HEIGHT) ** 0.5))
+    rows = -(-count // columns)
+    width = WIDTH // columns
+    height = min(main.Block.HEIGHT, HEIGHT // 2 // rows)
+    blocks = main.BlockStore(simulation.random, (width, height))
+    for i in range(count):
+        blocks.add(main.Block, i % columns * width, i // columns * height,
+                   width - 1, height - 1)
+    simulation.set_blocks(blocks)
+    return simulation
+
+
+def launched_simulation(blocks_count=None, balls_count=1):
+    simulation = new_simulation()
+    if blocks_count is not None:
+        dense_blocks(simulation, blocks_count)
+    catch_all_paddle(simulation)
+    simulation.step(1)
+    simulation.spawn_balls(balls_count - 1)
+    return simulation
+
+
+def run_steps(simulation):
+    for _ in range(STEPS):
+        simulation.step(0)
+
+
+def new_game_window(screen):
+    game_window = main.GameWindow(WIDTH, HEIGHT, screen)
+    game_window.set_menu(main.Menu(WIDTH, HEIGHT, screen, game_window))
+    game_window.game_objects_initial()
+    game_window.ui_initial()
+    game_window.background_layer_initial()
+    catch_all_paddle(game_window.simulation)
+    return game_window
+
+
+def frame(game_window):
+    game_window.simulation_events_handler(game_window.simulation.step(1))
+    game_window.update_game_loop(0.5)
+
+
+def load_assets():
+    main.AssetCache.clear()
+    for name in sorted(os.listdir("data")):
+        if name.endswith((".png", ".jpg")):
+            main.AssetCache.get_image(name)
+        elif name.endswith((".wav", ".mp3")):
+            main.AssetCache.get_sound(name)
+
+
+def run_benchmarks(screen):
+    results = {
+        "asset_load": measure(lambda _: load_assets()),
+        "level_construction": measure(
+            lambda simulation: simulation.blocks_placement(),
+            number=20, setup=new_simulation),
+        "restart": measure(
+            lambda simulation: simulation.restart(SEED),
+            number=20, setup=new_simulation),
+        "simulation_step": measure(
+            run_steps, setup=launched_simulation) / STEPS,
+        "frame": measure(frame, number=STEPS,
+                         setup=lambda: new_game_window(screen)),
+        "blocks_draw": measure(
+            lambda game_window: game_window.blocks_draw(
+                game_window.background_layer),
+            number=50, setup=lambda: new_game_window(screen)),
+    }
+    for count in BLOCK_COUNTS:
+        results[f"collision_step_{count}_blocks"] = measure(
+            run_steps,
+            setup=lambda: launched_simulation(blocks_count=count)) / STEPS
+    for count in BALL_COUNTS:
+        results[f"collision_step_{count}_balls"] = measure(
+            run_steps,
+            setup=lambda: launched_simulation(balls_count=count)) / STEPS
+
+    menu = main.Menu(WIDTH, HEIGHT, screen, main.GameWindow(
+        WIDTH, HEIGHT, screen))
+    results["menu_redraw"] = measure(lambda _: menu.update_menu_loop(),
+                                     number=50)
+    return results
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, value in results.items():
+        if name not in baseline:
+            print(f"{name:32} {value * 1000:10.4f} ms        (new)")
+            continue
+        ratio = value / baseline[name]
+        is_regression = ratio > 1 + threshold
+        print(f"{name:32} {value * 1000:10.4f} ms {ratio:8.2f}x"
+              + (" REGRESSION" if is_regression else ""))
+        if is_regression:
+            regressions.append(name)
+    return regressions
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(
+        description="Headless Arkanoid benchmarks")
+    parser.add_argument("--output", metavar="PATH",
+                        help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH",
+                        help="compare the results with a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="allowed slowdown ratio before a result is "
+                             "reported as a regression (default: 0.1)")
+    args = parser.parse_args()
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    results = run_benchmarks(screen)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"meta": {"python": platform.python_version(),
+                                "pygame": pygame.version.ver,
+                                "machine": platform.machine(),
+                                "platform": platform.platform()},
+                       "results": results}, file, indent=4)
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)["results"]
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+    elif not args.output:
+        for name, value in results.items():
+            print(f"{name:32} {value * 1000:10.4f} ms")
+
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,192 @@
+import os
+import random
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame  # noqa: E402
+
+import main  # noqa: E402
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+WIDTH, HEIGHT = 1280, 720
+
+
+class ArkanoidEnv:
+    ACTIONS = (0, -1, 1)
+    OBSERVATIONS = ("state", "pixels")
+    STATE_SIZE = 9
+    PIXEL_SCALE = 8
+    MAX_TICKS = main.GameSimulation.TICK_RATE * 60 * 5
+    BLOCK_REWARD = 1
+    BALL_LOST_REWARD = -1
+    WIN_REWARD = 10
+    BACKGROUND_SHADE = 0
+    OBJECT_SHADE = 255
+    BLOCK_SHADES = {main.Block: 96, main.ConcreteBlock: 160,
+                    main.IronBlock: 224}
+
+    def __init__(self, seed=None, level=None, observation="state",
+                 pixel_scale=PIXEL_SCALE, max_ticks=MAX_TICKS):
+        if observation not in self.OBSERVATIONS:
+            raise ValueError(f"unknown observation {observation!r}")
+        self.random = random.Random(seed)
+        self.observation = observation
+        self.pixel_scale = pixel_scale
+        self.max_ticks = max_ticks
+        self.simulation = main.GameSimulation(
+            WIDTH, HEIGHT, self.random.getrandbits(32), level)
+        self.pixel_size = (WIDTH // pixel_scale, HEIGHT // pixel_scale)
+        self.pixels = None
+        self.blocks_layer = None
+        if observation == "pixels":
+            self.pixels = pygame.Surface(self.pixel_size, depth=8)
+            self.blocks_layer = pygame.Surface(self.pixel_size, depth=8)
+
+    def get_observation_shape(self):
+        if self.observation == "pixels":
+            return self.pixel_size[1], self.pixel_size[0]
+        return (self.STATE_SIZE,)
+
+    def get_action_count(self):
+        return len(self.ACTIONS)
+
+    def reset(self, seed=None):
+        self.simulation.restart(
+            self.random.getrandbits(32) if seed is None else seed)
+        if self.blocks_layer is not None:
+            self.blocks_layer.fill(self.BACKGROUND_SHADE)
+            for index in self.simulation.blocks:
+                self.block_draw(index)
+        return self.convert(self.observe())
+
+    def step(self, action):
+        reward, done, info = self.advance(action)
+        return self.convert(self.observe()), reward, done, info
+
+    def advance(self, action):
+        simulation = self.simulation
+        score = simulation.score.get_score()
+        reward = 0
+        for event_type, value in simulation.step(self.ACTIONS[action]):
+            if event_type == main.GameSimulation.BALL_LOST_EVENT:
+                reward += self.BALL_LOST_REWARD
+            elif event_type == main.GameSimulation.GAME_END_EVENT:
+                if value == main.GameSimulation.WIN:
+                    reward += self.WIN_REWARD
+            elif self.blocks_layer is not None and event_type in (
+                    main.GameSimulation.BLOCK_CRASHED_EVENT,
+                    main.GameSimulation.BLOCK_HIT_EVENT):
+                self.block_draw(value)
+        reward += (simulation.score.get_score() - score) * self.BLOCK_REWARD
+        truncated = not simulation.is_finished() and \
+            simulation.ticks >= self.max_ticks
+        info = {"score": simulation.score.get_score(),
+                "lives": simulation.balls.get_lifes(),
+                "ticks": simulation.ticks,
+                "truncated": truncated}
+        return reward, simulation.is_finished() or truncated, info
+
+    def observe(self):
+        if self.observation == "pixels":
+            return self.get_pixels()
+        return self.get_state()
+
+    def convert(self, observation):
+        if numpy is None:
+            return observation
+        if self.observation == "pixels":
+            return numpy.frombuffer(observation, numpy.uint8).reshape(
+                self.get_observation_shape()).copy()
+        return numpy.array(observation, numpy.float32)
+
+    def get_state(self):
+        simulation = self.simulation
+        paddle = simulation.paddle
+        ball = simulation.balls.get_primary()
+        dx, dy = ball.get_velocity()
+        blocks = simulation.blocks
+        return [paddle.rect.centerx / WIDTH,
+                paddle.get_width() / WIDTH,
+                (ball.x + ball.radius) / WIDTH,
+                (ball.y + ball.radius) / HEIGHT,
+                dx / main.Ball.SPEED,
+                dy / main.Ball.SPEED,
+                float(ball.static_state()),
+                simulation.balls.get_lifes() / main.Ball.STANDART_LIFES,
+                len(blocks) / max(blocks.get_capacity(), 1)]
+
+    def get_pixels(self):
+        self.pixels.blit(self.blocks_layer, (0, 0))
+        self.pixels.fill(self.OBJECT_SHADE,
+                         self.scale_rect(self.simulation.paddle.rect))
+        for ball in self.simulation.balls:
+            self.pixels.fill(self.OBJECT_SHADE, self.scale_rect(ball.rect))
+        return pygame.image.tobytes(self.pixels, "P")
+
+    def block_draw(self, index):
+        blocks = self.simulation.blocks
+        rect = self.scale_rect(blocks.get_rect(index))
+        if blocks.is_alive(index):
+            shade = self.BLOCK_SHADES[blocks.get_kind(index)]
+            if blocks.get_hardness(index) < \
+                    blocks.get_kind(index).HARDNESS:
+                shade //= 2
+            self.blocks_layer.fill(shade, rect)
+        else:
+            self.blocks_layer.fill(self.BACKGROUND_SHADE, rect)
+
+    def scale_rect(self, rect):
+        scale = self.pixel_scale
+        return pygame.Rect(rect.x // scale, rect.y // scale,
+                           max(rect.w // scale, 1), max(rect.h // scale, 1))
+
+
+class VectorEnv:
+    def __init__(self, count, seed=0, **kwargs):
+        if numpy is None:
+            raise ImportError("VectorEnv needs NumPy for batched "
+                              "observations")
+        self.envs = [ArkanoidEnv(seed + index, **kwargs)
+                     for index in range(count)]
+        shape = self.envs[0].get_observation_shape()
+        dtype = numpy.uint8 if self.envs[0].observation == "pixels" else \
+            numpy.float32
+        self.observations = numpy.zeros((count,) + shape, dtype)
+        self.rewards = numpy.zeros(count, numpy.float32)
+        self.dones = numpy.zeros(count, bool)
+
+    def __len__(self):
+        return len(self.envs)
+
+    def reset(self):
+        for index, env in enumerate(self.envs):
+            env.reset()
+            self.write_observation(index, env)
+        return self.observations.copy()
+
+    def step(self, actions):
+        infos = []
+        for index, (env, action) in enumerate(zip(self.envs, actions)):
+            reward, done, info = env.advance(int(action))
+            if done:
+                info["final_observation"] = env.convert(env.observe())
+                env.reset()
+            self.write_observation(index, env)
+            self.rewards[index] = reward
+            self.dones[index] = done
+            infos.append(info)
+        return (self.observations.copy(), self.rewards.copy(),
+                self.dones.copy(), infos)
+
+    def write_observation(self, index, env):
+        observation = env.observe()
+        if env.observation == "pixels":
+            self.observations[index] = numpy.frombuffer(
+                observation, numpy.uint8).reshape(self.observations.shape[1:])
+        else:
+            self.observations[index] = observation
@@ -1,823 +1,2915 @@
-import os
-import pygame
-import sys
-from random import randint
-import datetime as dt
-
-
-class Bonus:
-    BONUS_SHOWING_TIME = 5
-    N_BLOCKS_FOR_GET_INCR_PLATFORM = 20
-
-    def __init__(self, window_sizes, paddle, ball, blocks):
-        self.win_width, self.win_height = window_sizes
-        self.start_bonus_showing_time = None
-        self.paddle = paddle
-        self.ball = ball
-        self.n_blocks, self.m_blocks = GameWindow.N_BLOCKS, GameWindow.M_BLOCKS
-        self.blocks = blocks
-
-    def is_bonus_can_get(self, n):
-        is_blocks_crashed = self.n_blocks * \
-            self.m_blocks - len(self.blocks) > 0
-        is_n_blocks_crashed = (
-            self.n_blocks * self.m_blocks - len(self.blocks)) % n == 0
-        return is_blocks_crashed and is_n_blocks_crashed
-
-    def try_get_incr_platform(self):
-        current_time = dt.datetime.now()
-        if self.start_bonus_showing_time is None \
-                and self.is_bonus_can_get(self.N_BLOCKS_FOR_GET_INCR_PLATFORM)\
-                and self.ball.get_lifes() >= Ball.STANDART_LIFES:
-            self.paddle.increase_width()
-            self.paddle.set_color(0, 0, 0)
-            self.ball.set_color(0, 0, 0)
-            self.paddle.gradient_effect()
-            self.ball.gradient_effect()
-            self.start_bonus_showing_time = current_time
-
-        elif self.start_bonus_showing_time is not None and \
-                (current_time -
-                 self.start_bonus_showing_time).seconds <= self.BONUS_SHOWING_TIME \
-                and self.ball.get_lifes() >= Ball.STANDART_LIFES:
-            self.paddle.gradient_effect()
-            self.ball.gradient_effect()
-        elif self.ball.get_lifes() < Ball.STANDART_LIFES:
-            self.paddle.set_color(*Paddle.STANDART_COLOR)
-            self.ball.set_color(*Ball.STANDART_COLOR)
-            self.paddle.set_width(Paddle.WIDTH)
-            self.start_bonus_showing_time = None
-        else:
-            self.paddle.set_color(*Paddle.STANDART_COLOR)
-            self.ball.set_color(*Ball.STANDART_COLOR)
-            self.start_bonus_showing_time = None
-
-    def try_get_life(self):
-        current_time = dt.datetime.now()
-        if self.start_bonus_showing_time is None \
-                and self.is_bonus_can_get(self.n_blocks * self.m_blocks//2):
-            self.ball.increase_lifes()
-            self.paddle.set_color(0, 0, 0)
-            self.ball.set_color(0, 0, 0)
-            self.paddle.gradient_effect()
-            self.ball.gradient_effect()
-            self.start_bonus_showing_time = current_time
-
-        elif self.start_bonus_showing_time is not None and \
-                (current_time -
-                 self.start_bonus_showing_time).seconds <= self.BONUS_SHOWING_TIME:
-            self.paddle.gradient_effect()
-            self.ball.gradient_effect()
-        elif self.ball.get_lifes() < Ball.STANDART_LIFES:
-            self.paddle.set_color(*Paddle.STANDART_COLOR)
-            self.ball.set_color(*Ball.STANDART_COLOR)
-            self.paddle.set_width(Paddle.WIDTH)
-            self.start_bonus_showing_time = None
-        else:
-            self.paddle.set_color(*Paddle.STANDART_COLOR)
-            self.ball.set_color(*Ball.STANDART_COLOR)
-            self.start_bonus_showing_time = None
-
-
-class Score:
-    FONT_SIZE = 36
-    SCORE_TEMPLATE = "Score: {}"
-    Y_INDENT_COEFF = 0.95
-    X_INDENT_PIXELS = 50
-    FONT_SIZE_COEFF = 5
-    STANDART_COLOR = (0, 255, 0)
-
-    def __init__(self, window_sizes):
-        self.score = 0
-        self.font = pygame.font.Font(None, self.FONT_SIZE)
-        self.win_width, self.win_height = window_sizes
-
-    def up_score(self):
-        self.score += 1
-
-    def draw(self, surf):
-        score_string = self.SCORE_TEMPLATE.format(str(self.score))
-        score_text = self.font.render(score_string, True, self.STANDART_COLOR)
-        surf.blit(score_text,
-                  (self.win_width - self.X_INDENT_PIXELS -
-                   len(score_string) *
-                   self.FONT_SIZE // self.FONT_SIZE_COEFF,
-                   self.win_height * self.Y_INDENT_COEFF))
-
-    def get_score(self):
-        return self.score
-
-
-class Ball(pygame.sprite.Sprite):
-    RADIUS = 7
-    SPEED = 5
-    STANDART_COLOR = (0, 255, 0)
-    STANDART_LIFES = 5
-    FONT_SIZE = 36
-    LIVES_TEMPLATE = "Lives left: {}"
-    Y_INDENT_COEFF = 0.95
-    COLLISION_EPSILON = 10
-
-    def __init__(self, window_sizes, all_sprites):
-        super().__init__(all_sprites)
-        self.win_width, self.win_height = window_sizes
-        self.radius = self.RADIUS
-        self.rect = pygame.Rect(0, 0, self.radius * 2, self.radius * 2)
-        self.speed = self.SPEED
-        self.color = self.STANDART_COLOR
-        self.font = pygame.font.Font(None, self.FONT_SIZE)
-        self.lifes = self.STANDART_LIFES
-        self.is_ball_static = True
-        self.x_direction = self.y_direction = 1
-
-    def invert_x_direction(self):
-        self.x_direction = -self.x_direction
-
-    def invert_y_direction(self):
-        self.y_direction = -self.y_direction
-
-    def get_x_direction(self):
-        return self.x_direction
-
-    def get_y_direction(self):
-        return self.y_direction
-
-    def set_static(self, state):
-        self.is_ball_static = state
-
-    def centering(self, paddle_x, paddle_y, paddle_width, paddle_height):
-
-        centering_x = paddle_x + (paddle_width -
-                                  self.get_radius())//2
-        centering_y = paddle_y -\
-            self.get_radius() * 2
-        self.set_pos(centering_x, centering_y)
-        self.set_static(True)
-
-    def static_state(self):
-        return self.is_ball_static
-
-    def draw(self, surf):
-        pygame.draw.ellipse(surf, self.color, self.rect)
-
-    def decrease_lifes(self):
-        self.lifes -= 1
-
-    def increase_lifes(self):
-        self.lifes += 1
-
-    def draw_lifes(self, surf):
-        lifes_count_text = self.font.render(
-            self.LIVES_TEMPLATE.format(str(self.lifes)),
-            True,
-            (0, 255, 0))
-        surf.blit(lifes_count_text, (0, self.win_height * self.Y_INDENT_COEFF))
-
-    def gradient_effect(self):
-        self.color = (randint(50, 255), randint(50, 255), randint(50, 255))
-
-    def get_lifes(self):
-        return self.lifes
-
-    def set_color(self, r, g, b):
-        self.color = (r, g, b)
-
-    def set_pos(self, x, y):
-        self.rect.x = x
-        self.rect.y = y
-
-    def get_pos(self):
-        return self.rect.x, self.rect.y
-
-    def get_radius(self):
-        return self.radius
-
-    def update(self):
-        self.rect.x += self.x_direction * self.speed
-        self.rect.y += self.y_direction * self.speed
-
-    def collision_detector(self, rect):
-
-        if self.get_x_direction() > 0:
-            dx = self.rect.right - rect.left
-        else:
-            dx = rect.right - self.rect.left
-        if self.get_y_direction() > 0:
-            dy = self.rect.bottom - rect.top
-        else:
-            dy = rect.bottom - self.rect.top
-        if abs(dx - dy) < self.COLLISION_EPSILON:
-            self.invert_x_direction()
-            self.invert_y_direction()
-        elif dx > dy:
-            self.invert_y_direction()
-        elif dx < dy:
-            self.invert_x_direction()
-
-
-class Block(pygame.sprite.Sprite):
-    WIDTH = 64
-    HEIGHT = 32
-    INDENT = 5
-
-    def __init__(self, all_sprites, x=0, y=0):
-        super().__init__(all_sprites)
-        self.width = self.WIDTH
-        self.height = self.HEIGHT
-        self.rect = pygame.Rect(x, y, self.width, self.height)
-        self.image = GameWindow.load_image(
-            "block" + str(randint(1, 5)) + ".png")
-        self.block_crashed_sound = pygame.mixer.Sound("data/block_crashed.mp3")
-
-    def draw(self, surf):
-        surf.blit(self.image, self.rect)
-
-    def play_crashed_effect(self, is_game_volumes_on):
-        if is_game_volumes_on:
-            self.block_crashed_sound.play()
-
-
-class ConcreteBlock(Block):
-    def __init__(self, all_sprites, hardness=1, x=0, y=0):
-        super().__init__(all_sprites)
-        self.width = self.WIDTH
-        self.height = self.HEIGHT
-        self.rect = pygame.Rect(x, y, self.width, self.height)
-        self.image = GameWindow.load_image(
-            "block" + str(randint(1, 5)) + ".png")
-        self.block_crashed_sound = pygame.mixer.Sound("data/block_crashed.mp3")
-        self.block_hit_sound = pygame.mixer.Sound("data/rock_hit.mp3")
-        self.hardness = hardness
-
-    def play_crashed_effect(self, is_game_volumes_on):
-        if is_game_volumes_on and self.hardness > 0:
-            self.block_hit_sound.play()
-        elif is_game_volumes_on:
-            self.block_crashed_sound.play()
-
-    def block_hitted(self):
-        self.image = GameWindow.load_image("block_hitted.png")
-        self.decrease_hardness()
-
-    def decrease_hardness(self):
-        self.hardness -= 1
-
-    def get_hardness(self):
-        return self.hardness
-
-
-class IronBlock(Block):
-    def __init__(self, all_sprites, x=0, y=0):
-        super().__init__(all_sprites)
-        self.width = self.WIDTH
-        self.height = self.HEIGHT
-        self.rect = pygame.Rect(x, y, self.width, self.height)
-        self.image = GameWindow.load_image("iron_block.png")
-        self.block_crashed_sound = pygame.mixer.Sound("data/metal_hit.wav")
-
-
-class Paddle(pygame.sprite.Sprite):
-    WIDTH = 90
-    HEIGHT = 7
-    SPEED = 10
-    Y_INDENT_COEFF = 0.9
-    BONUS_WIDTH_INCREASE = 30
-    STANDART_COLOR = (192, 192, 192)
-
-    def __init__(self, window_sizes, all_sprites):
-        super().__init__(all_sprites)
-        self.win_width, self.win_height = window_sizes
-        self.width, self.height = self.WIDTH, self.HEIGHT
-        self.rect = pygame.Rect(0, 0, self.width, self.height)
-        self.speed = self.SPEED
-        self.color = self.STANDART_COLOR
-        self.paddle_touch_sound = pygame.mixer.Sound(
-            "data/paddle_touch_sound.wav")
-        self.direction = 1
-
-    def play_touch_effect(self, is_game_volumes_on):
-        if is_game_volumes_on:
-            self.paddle_touch_sound.play()
-
-    def move(self):
-        if self.direction < 0 and self.rect.x > 0:
-            self.rect.x += self.direction * self.speed
-        elif self.direction > 0 and self.rect.x < self.win_width - self.width:
-            self.rect.x += self.direction * self.speed
-
-    def set_direction(self, val):
-        self.direction = val
-
-    def get_direction(self):
-        return self.direction
-
-    def increase_width(self):
-        self.width += self.BONUS_WIDTH_INCREASE
-        self.rect.w = self.width
-        x, y = self.get_pos()
-        if x + self.width > self.win_width:
-            self.set_pos(self.win_width - self.width, y)
-
-    def centering(self):
-        centering_paddle_x = (self.win_width - self.get_width())//2
-        centering_paddle_y = self.win_height * self.Y_INDENT_COEFF
-        self.set_pos(centering_paddle_x, centering_paddle_y)
-
-    def gradient_effect(self):
-        self.color = (randint(50, 255), randint(50, 255), randint(50, 255))
-
-    def set_width(self, width):
-        self.rect.w = width
-        self.width = width
-
-    def set_color(self, r, g, b):
-        self.color = (r, g, b)
-
-    def draw(self, surf):
-        pygame.draw.rect(surf, self.color, self.rect)
-
-    def set_pos(self, x, y):
-        self.rect.x = x
-        self.rect.y = y
-
-    def get_pos(self):
-        return self.rect.x, self.rect.y
-
-    def get_width(self):
-        return self.width
-
-    def get_height(self):
-        return self.height
-
-
-class GameWindow:
-    FPS = 60
-    N_BLOCKS = 8
-    M_BLOCKS = 18
-    IRON_BLOCKS_COORDS = [(0, 0),
-                          (0, N_BLOCKS - 1),
-                          (M_BLOCKS - 1, N_BLOCKS - 1),
-                          (M_BLOCKS - 1, 0),
-                          (M_BLOCKS//2 - 1, N_BLOCKS // 2 - 1),
-                          (M_BLOCKS // 2, N_BLOCKS // 2 - 1),
-                          (M_BLOCKS//2 + 1, N_BLOCKS//2 - 1),
-                          (M_BLOCKS//2 - 1, N_BLOCKS - 1),
-                          (M_BLOCKS//2, N_BLOCKS - 1),
-                          (M_BLOCKS//2 + 1, N_BLOCKS - 1)
-                          ]
-    CONCRETE_BLOCK_FREQ = 10
-
-    LOSE = 0
-    WIN = 1
-
-    def __init__(self, width, height, screen):
-        self.width = width
-        self.height = height
-        self.opened_menu = None
-        self.screen = screen
-        self.lose_sound = pygame.mixer.Sound("data/lose_sound.mp3")
-        self.win_sound = pygame.mixer.Sound("data/win_sound.wav")
-        self.game_background = self.load_image("game_background.jpg")
-
-    def ui_initial(self):
-        self.is_game_volumes_on = self.opened_menu.game_volumes_state()
-        self.pause = False
-        self.score = Score(self.get_window_size())
-        self.bonus = Bonus(self.get_window_size(),
-                           self.paddle, self.ball, self.blocks)
-        self.is_key_downed = False
-        self.clock = pygame.time.Clock()
-        self.pause_menu = PauseMenu(
-            self.width, self.height,
-            self.screen, self,
-            self.opened_menu.volume_control)
-        self.set_menu(self.pause_menu)
-
-    def game_objects_initial(self):
-        self.all_sprites = pygame.sprite.Group()
-        self.paddle = Paddle(self.get_window_size(), self.all_sprites)
-        self.paddle.centering()
-
-        self.ball = Ball(self.get_window_size(), self.all_sprites)
-        self.ball.centering(
-            *self.paddle.get_pos(),
-            self.paddle.get_width(), self.paddle.get_height())
-
-    def bonus_get_handler(self):
-        self.bonus.try_get_incr_platform()
-        self.bonus.try_get_life()
-
-    def start_game(self):
-        self.game_objects_initial()
-        self.blocks_placement()
-        self.ui_initial()
-
-        self.running = True
-
-        while self.running:
-            self.events_handler()
-            if not self.pause:
-                self.opened_menu.close_menu()
-                if self.is_key_downed:
-                    self.paddle.move()
-                    self.ball.set_static(False)
-                self.update_game_loop()
-                self.win_lost_detector()
-                block_hit_index = self.ball.rect.collidelist(
-                    list(map(lambda x: x.rect, self.blocks)))
-                self.blocks_collision_handler(block_hit_index)
-                self.collision_handler()
-
-            else:
-                self.pause_menu.draw()
-
-    def update_game_loop(self):
-        self.is_game_volumes_on = self.opened_menu.game_volumes_state()
-        self.screen.fill((0, 0, 0))
-        self.screen.blit(self.game_background,
-                         self.game_background.get_rect())
-        self.score.draw(self.screen)
-        self.ball.draw_lifes(self.screen)
-        if not self.ball.static_state():
-            self.ball.update()
-        self.paddle.draw(self.screen)
-        self.ball.draw(self.screen)
-        self.blocks_draw()
-        self.bonus_get_handler()
-        pygame.display.update()
-        pygame.display.flip()
-        self.clock.tick(GameWindow.FPS)
-
-    def play_game_end_effect(self, state):
-        if self.is_game_volumes_on:
-            if state == self.WIN:
-                self.win_sound.play()
-            else:
-                self.lose_sound.play()
-
-    def get_window_size(self):
-        return self.width, self.height
-
-    def win_lost_detector(self):
-        if not self.blocks:
-            self.play_game_end_effect(self.WIN)
-            self.game_end()
-            Menu(self.width, self.height, self.screen,
-                 self, self.score.get_score(), self.WIN,
-                 self.opened_menu.volume_control).draw()
-        ball_y = self.ball.get_pos()[1]
-        paddle_y = self.paddle.get_pos()[1]
-        if ball_y > paddle_y + self.paddle.get_height():
-            self.ball.decrease_lifes()
-
-            if self.ball.get_lifes() <= 0:
-                self.play_game_end_effect(self.LOSE)
-                self.game_end()
-                Menu(self.width, self.height, self.screen,
-                     self, self.score.get_score(), self.LOSE,
-                     self.opened_menu.volume_control).draw()
-            else:
-                self.paddle.set_width(Paddle.WIDTH)
-                self.paddle.centering()
-                self.ball.centering(
-                    *self.paddle.get_pos(), self.paddle.get_width(),
-                    self.paddle.get_height())
-
-    def collision_handler(self):
-        if self.ball.rect.colliderect(self.paddle.rect)\
-                and self.ball.get_y_direction() > 0:
-            self.paddle.play_touch_effect(self.is_game_volumes_on)
-            self.ball.collision_detector(self.paddle.rect)
-
-        up_collision_line = self.ball.rect.clipline(0, 0, self.width, 0)
-        right_collision_line = self.ball.rect.clipline(
-            self.width, 0, self.width, self.height)
-        left_collision_line = self.ball.rect.clipline(0, 0, 0, self.height)
-
-        if right_collision_line:
-            self.ball.invert_x_direction()
-        if left_collision_line:
-            self.ball.invert_x_direction()
-        if up_collision_line:
-            self.ball.invert_y_direction()
-
-    def blocks_placement(self):
-        self.blocks = []
-        for i in range(self.M_BLOCKS):
-            for j in range(self.N_BLOCKS):
-                if (i, j) in self.IRON_BLOCKS_COORDS:
-                    self.blocks.append(IronBlock(
-                        self.all_sprites, i * (Block.WIDTH + Block.INDENT),
-                        j * (Block.HEIGHT + Block.INDENT)))
-                elif i * j % self.CONCRETE_BLOCK_FREQ == 0:
-                    self.blocks.append(ConcreteBlock(
-                        self.all_sprites, x=i * (Block.WIDTH + Block.INDENT),
-                        y=j * (Block.HEIGHT + Block.INDENT)))
-
-                else:
-                    self.blocks.append(Block(
-                        self.all_sprites, i * (Block.WIDTH + Block.INDENT),
-                        j * (Block.HEIGHT + Block.INDENT)))
-
-    def blocks_draw(self):
-        for block in self.blocks:
-            block.draw(self.screen)
-
-    def pause_handler(self):
-        self.pause = not self.pause
-
-    def blocks_collision_handler(self, index):
-        if index != -1:
-            block = self.blocks[index]
-            if (type(block) == Block) or \
-                    (type(block) == ConcreteBlock
-                        and block.get_hardness() == 0):
-                self.score.up_score()
-                del self.blocks[index]
-                block.play_crashed_effect(self.is_game_volumes_on)
-                self.ball.collision_detector(block.rect)
-            elif type(block) == ConcreteBlock:
-                block.play_crashed_effect(self.is_game_volumes_on)
-                block.block_hitted()
-                self.ball.collision_detector(block.rect)
-            else:
-                block.play_crashed_effect(self.is_game_volumes_on)
-                self.ball.collision_detector(block.rect)
-
-    def events_handler(self):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.running = False
-                sys.exit(0)
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_RIGHT:
-                    self.is_key_downed = True
-                    self.paddle.set_direction(1)
-                    self.ball.set_static(False)
-                elif event.key == pygame.K_LEFT:
-                    self.is_key_downed = True
-                    self.paddle.set_direction(-1)
-                    self.ball.set_static(False)
-                elif event.key == pygame.K_ESCAPE:
-                    self.pause_handler()
-            if event.type == pygame.KEYUP:
-                self.is_key_downed = False
-
-    def set_menu(self, menu):
-        self.opened_menu = menu
-
-    def game_end(self):
-        self.screen.fill((0, 0, 0))
-        self.running = False
-
-    @staticmethod
-    def load_image(name, colorkey=None):
-        fullname = os.path.join("data", name)
-        if not os.path.isfile(fullname):
-            print(f"Файл с изображением '{fullname}' не найден")
-            sys.exit()
-        image = pygame.image.load(fullname)
-        if colorkey is not None:
-            image = image.convert()
-            if colorkey == -1:
-                colorkey = image.get_at((0, 0))
-            image.set_colorkey(colorkey)
-        else:
-            image = image.convert_alpha()
-        return image
-
-
-class VolumeControl:
-    VOLUME_IMG_WIDTH = 64
-    VOLUME_IMG_HEIGHT = 64
-
-    def __init__(self, game_window, screen, up_btn_h):
-        self.screen = screen
-        self.width, self.height = game_window.get_window_size()
-        self.clicks = 0
-        self.mute_img = game_window.load_image("mute.png")
-        self.unmute_img = game_window.load_image("unmute.png")
-        self.volume_control_img_rect = pygame.Rect((self.width -
-                                                    self.VOLUME_IMG_WIDTH)//2,
-                                                   self.height//2 -
-                                                   up_btn_h -
-                                                   self.VOLUME_IMG_HEIGHT,
-                                                   self.VOLUME_IMG_WIDTH,
-                                                   self.VOLUME_IMG_HEIGHT)
-
-    def draw(self):
-        if self.clicks % 2 == 0:
-            self.screen.blit(self.mute_img, self.volume_control_img_rect)
-        else:
-            self.screen.blit(self.unmute_img, self.volume_control_img_rect)
-
-    def click_handler(self):
-        self.clicks += 1
-        self.clicks = self.clicks % 2
-
-    def is_volume_on(self):
-        return self.clicks % 2 == 0
-
-    def is_point_in(self, x, y):
-        return self.volume_control_img_rect.collidepoint(x, y)
-
-
-class Menu:
-    FONT_SIZE = 36
-    TEMPLATE = "You {} with score: {}"
-    Y_INDENT_COEFF = 0.95
-    FONT_PX_COEFF = 3
-    START_BUTTON = 0
-    QUIT_BUTTON = 1
-    MUTE_UNMUTE_BUTTON = 2
-
-    def __init__(self, width, height, screen,
-                 game_window, score=None, end_state=None, volume_control=None):
-        self.font = pygame.font.Font(None, Score.FONT_SIZE)
-        self.end_state = end_state
-        self.score = score
-        self.width = width
-        self.height = height
-        self.screen = screen
-        self.game_window = game_window
-        self.background_font = GameWindow.load_image("menu_background.jpg")
-        self.start_btn_font = GameWindow.load_image("play_button.png")
-        self.start_btn_rect = pygame.Rect((self.width -
-                                           self.start_btn_font.get_width())//2,
-                                          (self.height -
-                                           self.start_btn_font.get_height())//2,
-                                          *self.start_btn_font.get_size())
-        self.quit_btn_font = GameWindow.load_image("quit_button.png")
-        self.quit_btn_rect = pygame.Rect((self.width -
-                                          self.quit_btn_font.get_width())//2,
-                                         (self.height +
-                                          self.quit_btn_font.get_height())//2,
-                                         *self.quit_btn_font.get_size())
-        self.btn_select_sound = pygame.mixer.Sound(
-            "data/menu_selection_click.wav")
-        self.selected_btn = None
-        if volume_control is None:
-            self.volume_control = VolumeControl(
-                self.game_window, self.screen,
-                self.start_btn_font.get_height())
-        else:
-            self.volume_control = volume_control
-
-    def draw(self):
-        self.running = True
-        self.game_window.set_menu(self)
-        while self.running:
-            self.events_handler()
-            self.update_menu_loop()
-
-    def update_menu_loop(self):
-        self.screen.fill((0, 0, 0))
-        self.screen.blit(self.background_font,
-                         self.background_font.get_rect())
-        self.volume_control.draw()
-        self.screen.blit(self.start_btn_font,
-                         self.start_btn_rect)
-        self.screen.blit(self.quit_btn_font, self.quit_btn_rect)
-        if self.score is not None and self.end_state is not None:
-            self.game_score_draw()
-        pygame.display.update()
-        pygame.display.flip()
-
-    def game_volumes_state(self):
-        return self.volume_control.is_volume_on()
-
-    def close_menu(self):
-        self.screen.fill((0, 0, 0))
-        self.end_state = None
-        self.score = None
-        self.running = False
-
-    def events_handler(self):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.close_menu()
-                sys.exit(0)
-            if event.type == pygame.MOUSEMOTION:
-                start_btn_selected = self.start_btn_rect.collidepoint(
-                    *event.pos)
-                quit_btn_selected = self.quit_btn_rect.collidepoint(*event.pos)
-                mute_unmute_btn_selected = self.volume_control.is_point_in(
-                    *event.pos)
-                if start_btn_selected and \
-                        self.selected_btn != self.START_BUTTON:
-                    self.selected_btn = self.START_BUTTON
-                    self.play_btn_selected_effect()
-                if quit_btn_selected and self.selected_btn != self.QUIT_BUTTON:
-                    self.selected_btn = self.QUIT_BUTTON
-                    self.play_btn_selected_effect()
-                if mute_unmute_btn_selected and \
-                        self.selected_btn != self.MUTE_UNMUTE_BUTTON:
-                    self.selected_btn = self.MUTE_UNMUTE_BUTTON
-                    self.play_btn_selected_effect()
-                if not start_btn_selected and \
-                    not quit_btn_selected and \
-                        not mute_unmute_btn_selected:
-                    self.selected_btn = None
-            if event.type == pygame.MOUSEBUTTONUP:
-                if self.start_btn_rect.collidepoint(*event.pos):
-                    self.game_window.start_game()
-                elif self.quit_btn_rect.collidepoint(*event.pos):
-                    self.close_menu()
-                    sys.exit(0)
-                elif self.volume_control.is_point_in(*event.pos):
-                    self.volume_control.click_handler()
-
-    def play_btn_selected_effect(self):
-        if self.volume_control.is_volume_on():
-            self.btn_select_sound.play()
-
-    def game_score_draw(self):
-        text_state = "win" if self.end_state == GameWindow.WIN else "lose"
-        end_text = self.font.render(
-            Menu.TEMPLATE.format(text_state, str(self.score)), True,
-            (0, 255, 0))
-        self.screen.blit(end_text,
-                         (0,
-                          self.height * Menu.Y_INDENT_COEFF))
-
-
-class PauseMenu(Menu):
-    def __init__(self, width, height, screen, game_window,
-                 volume_control, score=None, end_state=None):
-        self.font = pygame.font.Font(None, Score.FONT_SIZE)
-        self.end_state = end_state
-        self.score = score
-        self.width = width
-        self.height = height
-        self.screen = screen
-        self.game_window = game_window
-        self.background_font = GameWindow.load_image("game_background.jpg")
-        self.start_btn_font = GameWindow.load_image("play_button.png")
-        self.start_btn_rect = pygame.Rect((self.width -
-                                           self.start_btn_font.get_width())//2,
-                                          (self.height -
-                                           self.start_btn_font.get_height())//2,
-                                          *self.start_btn_font.get_size())
-        self.quit_btn_font = GameWindow.load_image("quit_button.png")
-        self.quit_btn_rect = pygame.Rect((self.width -
-                                          self.quit_btn_font.get_width())//2,
-                                         (self.height +
-                                          self.quit_btn_font.get_height())//2,
-                                         *self.quit_btn_font.get_size())
-        self.btn_select_sound = pygame.mixer.Sound(
-            "data/menu_selection_click.wav")
-        self.selected_btn = None
-        self.volume_control = volume_control
-
-    def events_handler(self):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.close_menu()
-                sys.exit(0)
-            if event.type == pygame.MOUSEMOTION:
-                start_btn_selected = self.start_btn_rect.collidepoint(
-                    *event.pos)
-                quit_btn_selected = self.quit_btn_rect.collidepoint(*event.pos)
-                mute_unmute_btn_selected = self.volume_control.is_point_in(
-                    *event.pos)
-                if start_btn_selected and \
-                        self.selected_btn != self.START_BUTTON:
-                    self.selected_btn = self.START_BUTTON
-                    self.play_btn_selected_effect()
-                if quit_btn_selected and self.selected_btn != self.QUIT_BUTTON:
-                    self.selected_btn = self.QUIT_BUTTON
-                    self.play_btn_selected_effect()
-                if mute_unmute_btn_selected and \
-                        self.selected_btn != self.MUTE_UNMUTE_BUTTON:
-                    self.selected_btn = self.MUTE_UNMUTE_BUTTON
-                    self.play_btn_selected_effect()
-                if not start_btn_selected and \
-                    not quit_btn_selected and \
-                        not mute_unmute_btn_selected:
-                    self.selected_btn = None
-            if event.type == pygame.MOUSEBUTTONUP:
-                if self.start_btn_rect.collidepoint(*event.pos):
-                    self.game_window.pause_handler()
-                    self.screen.fill((0, 0, 0))
-                    self.running = False
-                elif self.quit_btn_rect.collidepoint(*event.pos):
-                    self.close_menu()
-                    sys.exit(0)
-                elif self.volume_control.is_point_in(*event.pos):
-                    self.volume_control.click_handler()
-            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-                self.game_window.pause_handler()
-                self.screen.fill((0, 0, 0))
-                self.running = False
-
-
-def main():
-    pygame.init()
-    size = width, height = 1280, 720
-    screen = pygame.display.set_mode(size)
-    game_wnd = GameWindow(width, height, screen)
-    Menu(width, height, screen, game_wnd).draw()
-
-
-if __name__ == "__main__":
+import argparse
+import atexit
+import csv
+import hashlib
+import heapq
+import json
+import math
+import os
+import pygame
+import random
+import struct
+import sys
+import threading
+import time
+from array import array
+from collections import OrderedDict, deque
+from contextlib import contextmanager, nullcontext
+
+
+class EffectScheduler:
+    STATE = struct.Struct("<IH")
+    TIMER = struct.Struct("<dIB")
+
+    def __init__(self):
+        self.timers = []
+        self.counter = 0
+
+    def schedule(self, expire_time, effect):
+        heapq.heappush(self.timers, (expire_time, self.counter, effect))
+        self.counter += 1
+
+    def pop_expired(self, current_time):
+        expired = []
+        while self.timers and self.timers[0][0] <= current_time:
+            expired.append(heapq.heappop(self.timers)[2])
+        return expired
+
+    def clear(self):
+        self.timers.clear()
+
+    def get_state(self):
+        return self.STATE.pack(self.counter, len(self.timers)) + b"".join(
+            self.TIMER.pack(*timer) for timer in self.timers)
+
+    def set_state(self, data, offset=0):
+        self.counter, count = self.STATE.unpack_from(data, offset)
+        offset += self.STATE.size
+        self.timers = [self.TIMER.unpack_from(data, offset +
+                                              i * self.TIMER.size)
+                       for i in range(count)]
+        return offset + count * self.TIMER.size
+
+    def __len__(self):
+        return len(self.timers)
+
+
+class Bonus:
+    BONUS_SHOWING_TIME = 5
+    N_BLOCKS_FOR_GET_INCR_PLATFORM = 20
+    INCR_PLATFORM_EFFECT = 0
+    LIFE_EFFECT = 1
+    STATE = struct.Struct("<HHB")
+
+    def __init__(self, window_sizes, paddle, balls, blocks,
+                 incr_platform_blocks=N_BLOCKS_FOR_GET_INCR_PLATFORM,
+                 life_blocks=0):
+        self.win_width, self.win_height = window_sizes
+        self.paddle = paddle
+        self.balls = balls
+        self.blocks = blocks
+        Allocations.count("bonuses")
+        self.incr_platform_blocks = incr_platform_blocks
+        self.life_blocks = life_blocks
+        self.scheduler = EffectScheduler()
+        self.active_effects = 0
+
+    def reset(self):
+        self.scheduler.clear()
+        self.active_effects = 0
+
+    def get_state(self):
+        return self.STATE.pack(self.incr_platform_blocks, self.life_blocks,
+                               self.active_effects) + \
+            self.scheduler.get_state()
+
+    def set_state(self, data, offset=0):
+        self.incr_platform_blocks, self.life_blocks, self.active_effects = \
+            self.STATE.unpack_from(data, offset)
+        return self.scheduler.set_state(data, offset + self.STATE.size)
+
+    def get_life_blocks(self):
+        return self.life_blocks or max(self.blocks.get_capacity() // 2, 1)
+
+    def is_bonus_can_get(self, n):
+        crashed_blocks = self.blocks.get_capacity() - len(self.blocks)
+        return crashed_blocks > 0 and crashed_blocks % n == 0
+
+    def block_crashed_handler(self, current_time):
+        if self.is_bonus_can_get(self.incr_platform_blocks) \
+                and self.balls.get_lifes() >= Ball.STANDART_LIFES:
+            self.paddle.increase_width()
+            self.start_effect(self.INCR_PLATFORM_EFFECT, current_time)
+        if self.is_bonus_can_get(self.get_life_blocks()):
+            self.balls.increase_lifes()
+            self.start_effect(self.LIFE_EFFECT, current_time)
+
+    def start_effect(self, effect, current_time):
+        if not self.active_effects:
+            self.paddle.set_color(0, 0, 0)
+            self.balls.set_color(0, 0, 0)
+        self.active_effects += 1
+        self.scheduler.schedule(current_time + self.BONUS_SHOWING_TIME,
+                                effect)
+
+    def update(self, current_time):
+        expired = self.scheduler.pop_expired(current_time)
+        self.active_effects -= len(expired)
+        if self.active_effects:
+            self.paddle.gradient_effect()
+            self.balls.gradient_effect()
+        elif expired:
+            self.paddle.set_color(*Paddle.STANDART_COLOR)
+            self.balls.set_color(*Ball.STANDART_COLOR)
+
+
+class AssetCache:
+    images = {}
+    scaled_images = {}
+    decoded_images = {}
+    sounds = {}
+    loading = set()
+    hits = 0
+    misses = 0
+    pcm_cache_dir = None
+
+    @classmethod
+    def get_image(cls, name, colorkey=None):
+        key = (name, colorkey)
+        image = cls.images.get(key)
+        if image is None:
+            cls.misses += 1
+            image = GameWindow.load_image(name, colorkey,
+                                          cls.decoded_images.get(name))
+            cls.images[key] = image
+        else:
+            cls.hits += 1
+        return image
+
+    @classmethod
+    def get_scaled_image(cls, name, size, smooth=True):
+        key = (name, size, smooth)
+        image = cls.scaled_images.get(key)
+        if image is None:
+            cls.misses += 1
+            image = cls.get_image(name)
+            if image.get_size() != size:
+                scale = pygame.transform.smoothscale if smooth else \
+                    pygame.transform.scale
+                image = scale(image, size)
+            cls.scaled_images[key] = image
+        else:
+            cls.hits += 1
+        return image
+
+    @classmethod
+    def peek_image(cls, name, colorkey=None):
+        if (name, colorkey) not in cls.images and \
+                name not in cls.decoded_images and name in cls.loading:
+            return None
+        return cls.get_image(name, colorkey)
+
+    @classmethod
+    def get_sound(cls, name):
+        sound = cls.sounds.get(name)
+        if sound is None:
+            cls.misses += 1
+            sound = cls.load_sound(name)
+            cls.sounds[name] = sound
+        else:
+            cls.hits += 1
+        return sound
+
+    @classmethod
+    def load_sound(cls, name):
+        path = os.path.join("data", name)
+        if cls.pcm_cache_dir is None:
+            return pygame.mixer.Sound(path)
+        frequency, size, channels = pygame.mixer.get_init()
+        cache_path = os.path.join(
+            cls.pcm_cache_dir, "{}-{}-{}-{}-{}.pcm".format(
+                name, int(os.path.getmtime(path)), frequency, size, channels))
+        if os.path.isfile(cache_path):
+            with open(cache_path, "rb") as file:
+                return pygame.mixer.Sound(buffer=file.read())
+        sound = pygame.mixer.Sound(path)
+        os.makedirs(cls.pcm_cache_dir, exist_ok=True)
+        with open(cache_path, "wb") as file:
+            file.write(sound.get_raw())
+        return sound
+
+    @classmethod
+    def get_stats(cls):
+        return {"hits": cls.hits, "misses": cls.misses,
+                "images": len(cls.images), "sounds": len(cls.sounds),
+                "atlases": len(TextureAtlas.atlases)}
+
+    @classmethod
+    def get_loading_progress(cls, total):
+        return 1 - len(cls.loading) / total if total else 1
+
+    @classmethod
+    def clear(cls):
+        cls.images.clear()
+        cls.scaled_images.clear()
+        cls.decoded_images.clear()
+        cls.sounds.clear()
+        TextureAtlas.clear()
+        cls.hits = cls.misses = 0
+
+
+class SoundPool:
+    BLOCKS = "blocks"
+    PADDLE = "paddle"
+    UI = "ui"
+    GAME_END = "game_end"
+    CHANNEL_GROUPS = ((BLOCKS, 6), (PADDLE, 2), (UI, 2), (GAME_END, 1))
+    THROTTLE_TIME = 1000 // 60
+    channels = {}
+    started = {}
+    last_played = {}
+    counter = 0
+    played = 0
+    throttled = 0
+    stolen = 0
+
+    @classmethod
+    def init(cls):
+        total = sum(count for _, count in cls.CHANNEL_GROUPS)
+        if pygame.mixer.get_num_channels() < total:
+            pygame.mixer.set_num_channels(total)
+        pygame.mixer.set_reserved(total)
+        index = 0
+        for group, count in cls.CHANNEL_GROUPS:
+            cls.channels[group] = [pygame.mixer.Channel(i)
+                                   for i in range(index, index + count)]
+            cls.started[group] = [0] * count
+            index += count
+
+    @classmethod
+    def play(cls, name, group):
+        if not pygame.mixer.get_init():
+            return None
+        if not cls.channels:
+            cls.init()
+        now = pygame.time.get_ticks()
+        last = cls.last_played.get(name)
+        if last is not None and now - last < cls.THROTTLE_TIME:
+            cls.throttled += 1
+            return None
+        cls.last_played[name] = now
+        channels = cls.channels[group]
+        started = cls.started[group]
+        for index, channel in enumerate(channels):
+            if not channel.get_busy():
+                break
+        else:
+            index = started.index(min(started))
+            cls.stolen += 1
+        cls.counter += 1
+        started[index] = cls.counter
+        cls.played += 1
+        channels[index].play(AssetCache.get_sound(name))
+        return channels[index]
+
+    @classmethod
+    def get_voice_usage(cls):
+        return {group: sum(channel.get_busy() for channel in channels)
+                for group, channels in cls.channels.items()}
+
+    @classmethod
+    def get_stats(cls):
+        return {"played": cls.played, "throttled": cls.throttled,
+                "stolen": cls.stolen, "voices": cls.get_voice_usage()}
+
+    @classmethod
+    def clear(cls):
+        cls.channels.clear()
+        cls.started.clear()
+        cls.last_played.clear()
+        cls.counter = cls.played = cls.throttled = cls.stolen = 0
+
+
+class TextCache:
+    MAX_SIZE = 256
+    fonts = {}
+    surfaces = OrderedDict()
+    hits = 0
+    misses = 0
+
+    @classmethod
+    def get_font(cls, size, name=None):
+        key = (name, size)
+        font = cls.fonts.get(key)
+        if font is None:
+            font = pygame.font.Font(name, size)
+            cls.fonts[key] = font
+        return font
+
+    @classmethod
+    def render(cls, font, text, color, antialias=True):
+        key = (text, tuple(color), font, antialias)
+        surface = cls.surfaces.get(key)
+        if surface is not None:
+            cls.hits += 1
+            cls.surfaces.move_to_end(key)
+            return surface
+        cls.misses += 1
+        surface = font.render(text, antialias, color)
+        cls.surfaces[key] = surface
+        if len(cls.surfaces) > cls.MAX_SIZE:
+            cls.surfaces.popitem(last=False)
+        return surface
+
+    @classmethod
+    def get_stats(cls):
+        return {"hits": cls.hits, "misses": cls.misses,
+                "surfaces": len(cls.surfaces)}
+
+    @classmethod
+    def clear(cls):
+        cls.surfaces.clear()
+        cls.hits = cls.misses = 0
+
+
+class EffectSprites:
+    PALETTE_SIZE = 64
+    PALETTE_SEED = 0
+    MIN_COMPONENT = 50
+    PRERENDERED_WIDENINGS = 4
+    palette = None
+    sprites = {}
+
+    @classmethod
+    def get_palette(cls):
+        if cls.palette is None:
+            rng = random.Random(cls.PALETTE_SEED)
+            cls.palette = tuple(
+                tuple(rng.randint(cls.MIN_COMPONENT, 255) for _ in range(3))
+                for _ in range(cls.PALETTE_SIZE))
+        return cls.palette
+
+    @classmethod
+    def new_sprite(cls, size):
+        sprite = pygame.Surface(size, pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert_alpha()
+        return sprite
+
+    @classmethod
+    def get_ball_sprite(cls, color, radius):
+        key = ("ball", color, radius)
+        sprite = cls.sprites.get(key)
+        if sprite is None:
+            sprite = cls.new_sprite((radius * 2, radius * 2))
+            sprite.fill((0, 0, 0, 0))
+            pygame.draw.ellipse(sprite, color, sprite.get_rect())
+            cls.sprites[key] = sprite
+        return sprite
+
+    @classmethod
+    def get_paddle_sprite(cls, color, width, height):
+        key = ("paddle", color, width, height)
+        sprite = cls.sprites.get(key)
+        if sprite is None:
+            sprite = cls.new_sprite((width, height))
+            sprite.fill(color)
+            cls.sprites[key] = sprite
+        return sprite
+
+    @classmethod
+    def prerender(cls, viewport=None):
+        colors = cls.get_palette() + (Ball.STANDART_COLOR,
+                                      Paddle.STANDART_COLOR, (0, 0, 0))
+        scale_length = round if viewport is None else viewport.scale_length
+        for color in colors:
+            cls.get_ball_sprite(color, scale_length(Ball.RADIUS))
+            for i in range(cls.PRERENDERED_WIDENINGS + 1):
+                cls.get_paddle_sprite(
+                    color, scale_length(Paddle.WIDTH +
+                                        i * Paddle.BONUS_WIDTH_INCREASE),
+                    scale_length(Paddle.HEIGHT))
+
+    @classmethod
+    def clear(cls):
+        cls.sprites.clear()
+
+
+class Allocations:
+    counts = {}
+
+    @classmethod
+    def count(cls, name):
+        cls.counts[name] = cls.counts.get(name, 0) + 1
+
+    @classmethod
+    def get_stats(cls):
+        return dict(cls.counts)
+
+    @classmethod
+    def clear(cls):
+        cls.counts.clear()
+
+
+class Score:
+    FONT_SIZE = 36
+    SCORE_TEMPLATE = "Score: {}"
+    Y_INDENT_COEFF = 0.95
+    X_INDENT_PIXELS = 50
+    STANDART_COLOR = (0, 255, 0)
+
+    def __init__(self, window_sizes):
+        Allocations.count("scores")
+        self.score = 0
+        self.score_text = None
+        self.rendered_score = None
+        self.win_width, self.win_height = window_sizes
+
+    def reset(self):
+        self.score = 0
+
+    def set_score(self, score):
+        self.score = score
+
+    def up_score(self):
+        self.score += 1
+
+    def draw(self, surf, viewport=None):
+        if self.rendered_score != (self.score, viewport):
+            scale = 1 if viewport is None else viewport.scale
+            score_string = self.SCORE_TEMPLATE.format(str(self.score))
+            self.score_text = TextCache.render(
+                TextCache.get_font(round(self.FONT_SIZE * scale)),
+                score_string, self.STANDART_COLOR)
+            self.score_text_pos = (self.win_width - self.X_INDENT_PIXELS -
+                                   self.score_text.get_width() / scale,
+                                   self.win_height * self.Y_INDENT_COEFF)
+            if viewport is not None:
+                self.score_text_pos = viewport.to_window_pos(
+                    self.score_text_pos)
+            self.rendered_score = (self.score, viewport)
+        return surf.blit(self.score_text, self.score_text_pos)
+
+    def get_score(self):
+        return self.score
+
+
+class Ball(pygame.sprite.Sprite):
+    RADIUS = 7
+    SPEED = 5
+    STANDART_COLOR = (0, 255, 0)
+    STANDART_LIFES = 5
+    FONT_SIZE = 36
+    LIVES_TEMPLATE = "Lives left: {}"
+    Y_INDENT_COEFF = 0.95
+    COLLISION_EPSILON = 10
+    CORNER_NORMAL_RATIO = 2
+    STATE = struct.Struct("<ddhhdBBBBBbb")
+
+    def __init__(self, window_sizes, all_sprites, rng=random):
+        super().__init__(all_sprites)
+        Allocations.count("balls")
+        self.win_width, self.win_height = window_sizes
+        self.rect = pygame.Rect(0, 0, self.RADIUS * 2, self.RADIUS * 2)
+        self.reset(rng)
+
+    def reset(self, rng=random):
+        self.random = rng
+        self.radius = self.RADIUS
+        self.rect.update(0, 0, self.radius * 2, self.radius * 2)
+        self.x = self.y = 0
+        self.speed = self.SPEED
+        self.color = self.STANDART_COLOR
+        self.prev_pos = (0, 0)
+        self.palette_index = self.random.randrange(EffectSprites.PALETTE_SIZE)
+        self.is_ball_static = True
+        self.x_direction = self.y_direction = 1
+
+    def invert_x_direction(self):
+        self.x_direction = -self.x_direction
+
+    def invert_y_direction(self):
+        self.y_direction = -self.y_direction
+
+    def get_x_direction(self):
+        return self.x_direction
+
+    def get_y_direction(self):
+        return self.y_direction
+
+    def set_static(self, state):
+        self.is_ball_static = state
+
+    def centering(self, paddle_x, paddle_y, paddle_width, paddle_height):
+
+        centering_x = paddle_x + (paddle_width -
+                                  self.get_radius())//2
+        centering_y = paddle_y -\
+            self.get_radius() * 2
+        self.set_pos(centering_x, centering_y)
+        self.set_static(True)
+
+    def static_state(self):
+        return self.is_ball_static
+
+    def draw(self, surf, pos=None, viewport=None):
+        pos = self.rect.topleft if pos is None else pos
+        if viewport is None:
+            return surf.blit(
+                EffectSprites.get_ball_sprite(self.color, self.radius), pos)
+        return surf.blit(
+            EffectSprites.get_ball_sprite(
+                self.color, viewport.scale_length(self.radius)),
+            viewport.to_window_pos(pos))
+
+    def gradient_effect(self):
+        palette = EffectSprites.get_palette()
+        self.palette_index = (self.palette_index + 1) % len(palette)
+        self.color = palette[self.palette_index]
+
+    def set_color(self, r, g, b):
+        self.color = (r, g, b)
+
+    def set_pos(self, x, y):
+        self.x, self.y = x, y
+        self.rect.x = round(x)
+        self.rect.y = round(y)
+
+    def get_pos(self):
+        return self.rect.x, self.rect.y
+
+    def store_previous_pos(self):
+        self.prev_pos = self.get_pos()
+
+    def get_state(self):
+        return self.STATE.pack(self.x, self.y, *self.prev_pos, self.speed,
+                               *self.color, self.palette_index,
+                               self.is_ball_static, self.x_direction,
+                               self.y_direction)
+
+    def set_state(self, data, offset=0):
+        (x, y, prev_x, prev_y, self.speed, r, g, b, self.palette_index,
+         is_ball_static, self.x_direction, self.y_direction) = \
+            self.STATE.unpack_from(data, offset)
+        self.set_pos(x, y)
+        self.prev_pos = (prev_x, prev_y)
+        self.color = (r, g, b)
+        self.is_ball_static = bool(is_ball_static)
+        return offset + self.STATE.size
+
+    def get_radius(self):
+        return self.radius
+
+    def get_velocity(self):
+        return self.x_direction * self.speed, self.y_direction * self.speed
+
+    def move(self, dx, dy):
+        self.set_pos(self.x + dx, self.y + dy)
+
+    def update(self):
+        self.move(*self.get_velocity())
+
+    def sweep(self, rect, dx, dy):
+        radius = self.radius
+        cx, cy = self.x + radius, self.y + radius
+        closest_x = min(max(cx, rect.left), rect.right)
+        closest_y = min(max(cy, rect.top), rect.bottom)
+        dist_x, dist_y = cx - closest_x, cy - closest_y
+        dist = math.hypot(dist_x, dist_y)
+        if dist < radius:
+            if dist > 0:
+                normal = (dist_x / dist, dist_y / dist)
+            else:
+                normal = self.collision_normal(rect)
+            if normal[0] * dx + normal[1] * dy < 0:
+                return 0, normal
+            return None
+
+        t_enter, t_exit = -math.inf, math.inf
+        normal = None
+        for start, delta, low, high, axis in (
+                (cx, dx, rect.left - radius, rect.right + radius, 0),
+                (cy, dy, rect.top - radius, rect.bottom + radius, 1)):
+            if delta == 0:
+                if not low <= start <= high:
+                    return None
+                continue
+            t1, t2 = (low - start) / delta, (high - start) / delta
+            if t1 > t2:
+                t1, t2 = t2, t1
+            if t1 > t_enter:
+                t_enter = t1
+                normal = (-1 if delta > 0 else 1, 0) if axis == 0 \
+                    else (0, -1 if delta > 0 else 1)
+            t_exit = min(t_exit, t2)
+        if normal is None or t_enter > t_exit or t_enter > 1 or t_exit < 0:
+            return None
+
+        t = max(t_enter, 0)
+        px, py = cx + dx * t, cy + dy * t
+        if rect.left <= px <= rect.right or rect.top <= py <= rect.bottom:
+            return t, normal
+
+        corner_x = rect.left if px < rect.left else rect.right
+        corner_y = rect.top if py < rect.top else rect.bottom
+        fx, fy = cx - corner_x, cy - corner_y
+        a = dx * dx + dy * dy
+        b = 2 * (fx * dx + fy * dy)
+        c = fx * fx + fy * fy - radius * radius
+        discriminant = b * b - 4 * a * c
+        if discriminant < 0:
+            return None
+        t = (-b - math.sqrt(discriminant)) / (2 * a)
+        if not 0 <= t <= 1:
+            return None
+        return t, ((cx + dx * t - corner_x) / radius,
+                   (cy + dy * t - corner_y) / radius)
+
+    def bounce(self, normal):
+        nx, ny = normal
+        if abs(nx) * self.CORNER_NORMAL_RATIO >= abs(ny) \
+                and nx * self.x_direction < 0:
+            self.invert_x_direction()
+        if abs(ny) * self.CORNER_NORMAL_RATIO >= abs(nx) \
+                and ny * self.y_direction < 0:
+            self.invert_y_direction()
+
+    def collision_normal(self, rect):
+        if self.get_x_direction() > 0:
+            dx = self.rect.right - rect.left
+        else:
+            dx = rect.right - self.rect.left
+        if self.get_y_direction() > 0:
+            dy = self.rect.bottom - rect.top
+        else:
+            dy = rect.bottom - self.rect.top
+        if abs(dx - dy) < self.COLLISION_EPSILON:
+            return -self.x_direction, -self.y_direction
+        elif dx > dy:
+            return 0, -self.y_direction
+        return -self.x_direction, 0
+
+
+class BallPool:
+    MAX_SIZE = 512
+    STATE = struct.Struct("<hH")
+
+    def __init__(self, window_sizes, all_sprites, rng=random):
+        Allocations.count("ball_pools")
+        self.window_sizes = window_sizes
+        self.win_width, self.win_height = window_sizes
+        self.all_sprites = all_sprites
+        self.random = rng
+        self.balls = [Ball(window_sizes, all_sprites, rng)]
+        self.free_balls = []
+        self.lifes = Ball.STANDART_LIFES
+        self.lifes_text = None
+        self.rendered_lifes = None
+
+    def reset(self, rng=random):
+        self.random = rng
+        self.remove_extra_balls()
+        self.get_primary().reset(rng)
+        self.lifes = Ball.STANDART_LIFES
+
+    def get_primary(self):
+        return self.balls[0]
+
+    def spawn(self, count):
+        primary = self.get_primary()
+        for i in range(min(count, self.MAX_SIZE - len(self.balls))):
+            ball = self.new_ball()
+            ball.speed = primary.speed
+            ball.color = primary.color
+            ball.x_direction = primary.x_direction * (-1 if i % 2 else 1)
+            ball.y_direction = primary.y_direction * (-1 if i % 4 > 1 else 1)
+            offset = (i // 4 + 1) * ball.get_radius() * \
+                (1 if ball.x_direction > 0 else -1)
+            ball.set_pos(min(max(primary.x + offset, 0),
+                             self.win_width - ball.rect.w), primary.y)
+            ball.set_static(primary.static_state())
+            ball.store_previous_pos()
+            self.balls.append(ball)
+
+    def new_ball(self):
+        if not self.free_balls:
+            return Ball(self.window_sizes, self.all_sprites, self.random)
+        ball = self.free_balls.pop()
+        ball.reset(self.random)
+        ball.add(self.all_sprites)
+        return ball
+
+    def remove(self, ball):
+        self.balls.remove(ball)
+        ball.kill()
+        self.free_balls.append(ball)
+
+    def get_state(self):
+        return self.STATE.pack(self.lifes, len(self.balls)) + b"".join(
+            ball.get_state() for ball in self.balls)
+
+    def set_state(self, data, offset=0):
+        self.lifes, count = self.STATE.unpack_from(data, offset)
+        offset += self.STATE.size
+        for ball in self.balls[count:]:
+            ball.kill()
+        self.free_balls.extend(self.balls[count:])
+        del self.balls[count:]
+        while len(self.balls) < count:
+            if self.free_balls:
+                ball = self.free_balls.pop()
+                ball.add(self.all_sprites)
+            else:
+                ball = Ball(self.window_sizes, self.all_sprites, random)
+            self.balls.append(ball)
+        for ball in self.balls:
+            offset = ball.set_state(data, offset)
+        return offset
+
+    def remove_extra_balls(self):
+        for ball in self.balls[1:]:
+            ball.kill()
+        self.free_balls.extend(self.balls[1:])
+        del self.balls[1:]
+
+    def centering(self, paddle_x, paddle_y, paddle_width, paddle_height):
+        self.remove_extra_balls()
+        self.get_primary().centering(paddle_x, paddle_y,
+                                     paddle_width, paddle_height)
+
+    def set_static(self, state):
+        for ball in self.balls:
+            ball.set_static(state)
+
+    def static_state(self):
+        return self.get_primary().static_state()
+
+    def store_previous_state(self):
+        for ball in self.balls:
+            ball.store_previous_pos()
+
+    def set_color(self, r, g, b):
+        for ball in self.balls:
+            ball.set_color(r, g, b)
+
+    def gradient_effect(self):
+        primary = self.get_primary()
+        primary.gradient_effect()
+        for ball in self.balls[1:]:
+            ball.set_color(*primary.color)
+
+    def decrease_lifes(self):
+        self.lifes -= 1
+
+    def increase_lifes(self):
+        self.lifes += 1
+
+    def get_lifes(self):
+        return self.lifes
+
+    def draw_lifes(self, surf, viewport=None):
+        if self.rendered_lifes != (self.lifes, viewport):
+            scale = 1 if viewport is None else viewport.scale
+            self.lifes_text = TextCache.render(
+                TextCache.get_font(round(Ball.FONT_SIZE * scale)),
+                Ball.LIVES_TEMPLATE.format(str(self.lifes)),
+                (0, 255, 0))
+            self.rendered_lifes = (self.lifes, viewport)
+        pos = (0, self.win_height * Ball.Y_INDENT_COEFF)
+        return surf.blit(self.lifes_text, pos if viewport is None else
+                         viewport.to_window_pos(pos))
+
+    def __iter__(self):
+        return iter(self.balls)
+
+    def __len__(self):
+        return len(self.balls)
+
+
+class Block:
+    WIDTH = 64
+    HEIGHT = 32
+    INDENT = 5
+    HARDNESS = 0
+    BREAKABLE = True
+    IMAGE_NAMES = ("block1.png", "block2.png", "block3.png",
+                   "block4.png", "block5.png")
+    TEXTURE_NAMES = tuple(f"block{i}.png" for i in range(1, 21))
+    CRASHED_SOUND_NAME = "block_crashed.mp3"
+
+    @classmethod
+    def play_crashed_effect(cls, is_game_volumes_on):
+        if is_game_volumes_on:
+            SoundPool.play(cls.CRASHED_SOUND_NAME, SoundPool.BLOCKS)
+
+    @classmethod
+    def play_hit_effect(cls, is_game_volumes_on):
+        cls.play_crashed_effect(is_game_volumes_on)
+
+
+class ConcreteBlock(Block):
+    HARDNESS = 1
+    HITTED_IMAGE_NAME = "block_hitted.png"
+    HIT_SOUND_NAME = "rock_hit.mp3"
+
+    @classmethod
+    def play_hit_effect(cls, is_game_volumes_on):
+        if is_game_volumes_on:
+            SoundPool.play(cls.HIT_SOUND_NAME, SoundPool.BLOCKS)
+
+
+class IronBlock(Block):
+    BREAKABLE = False
+    IMAGE_NAMES = ("iron_block.png",)
+    CRASHED_SOUND_NAME = "metal_hit.wav"
+
+
+class Paddle(pygame.sprite.Sprite):
+    WIDTH = 90
+    HEIGHT = 7
+    SPEED = 10
+    Y_INDENT_COEFF = 0.9
+    BONUS_WIDTH_INCREASE = 30
+    STANDART_COLOR = (192, 192, 192)
+    TOUCH_SOUND_NAME = "paddle_touch_sound.wav"
+    STATE = struct.Struct("<hhHHddBBBB")
+
+    def __init__(self, window_sizes, all_sprites, rng=random):
+        super().__init__(all_sprites)
+        Allocations.count("paddles")
+        self.win_width, self.win_height = window_sizes
+        self.rect = pygame.Rect(0, 0, self.WIDTH, self.HEIGHT)
+        self.reset(rng)
+
+    def reset(self, rng=random):
+        self.random = rng
+        self.width, self.height = self.WIDTH, self.HEIGHT
+        self.rect.update(0, 0, self.width, self.height)
+        self.speed = self.SPEED
+        self.color = self.STANDART_COLOR
+        self.palette_index = self.random.randrange(EffectSprites.PALETTE_SIZE)
+        self.direction = 1
+
+    def play_touch_effect(self, is_game_volumes_on):
+        if is_game_volumes_on:
+            SoundPool.play(self.TOUCH_SOUND_NAME, SoundPool.PADDLE)
+
+    def move(self):
+        if self.direction < 0 and self.rect.x > 0:
+            self.rect.x += round(self.direction * self.speed)
+        elif self.direction > 0 and self.rect.x < self.win_width - self.width:
+            self.rect.x += round(self.direction * self.speed)
+
+    def set_direction(self, val):
+        self.direction = val
+
+    def get_direction(self):
+        return self.direction
+
+    def increase_width(self):
+        self.width += self.BONUS_WIDTH_INCREASE
+        self.rect.w = self.width
+        x, y = self.get_pos()
+        if x + self.width > self.win_width:
+            self.set_pos(self.win_width - self.width, y)
+
+    def centering(self):
+        centering_paddle_x = (self.win_width - self.get_width())//2
+        centering_paddle_y = self.win_height * self.Y_INDENT_COEFF
+        self.set_pos(centering_paddle_x, centering_paddle_y)
+
+    def gradient_effect(self):
+        palette = EffectSprites.get_palette()
+        self.palette_index = (self.palette_index + 1) % len(palette)
+        self.color = palette[self.palette_index]
+
+    def set_width(self, width):
+        self.rect.w = width
+        self.width = width
+
+    def set_color(self, r, g, b):
+        self.color = (r, g, b)
+
+    def draw(self, surf, pos=None, viewport=None):
+        pos = self.rect.topleft if pos is None else pos
+        if viewport is None:
+            return surf.blit(
+                EffectSprites.get_paddle_sprite(self.color, *self.rect.size),
+                pos)
+        return surf.blit(
+            EffectSprites.get_paddle_sprite(
+                self.color, *viewport.scale_size(self.rect.size)),
+            viewport.to_window_pos(pos))
+
+    def set_pos(self, x, y):
+        self.rect.x = x
+        self.rect.y = y
+
+    def get_state(self):
+        return self.STATE.pack(*self.rect, self.speed, self.direction,
+                               *self.color, self.palette_index)
+
+    def set_state(self, data, offset=0):
+        (x, y, self.width, self.height, self.speed, self.direction,
+         r, g, b, self.palette_index) = self.STATE.unpack_from(data, offset)
+        self.rect.update(x, y, self.width, self.height)
+        self.color = (r, g, b)
+        return offset + self.STATE.size
+
+    def get_pos(self):
+        return self.rect.x, self.rect.y
+
+    def get_width(self):
+        return self.width
+
+    def get_height(self):
+        return self.height
+
+
+class BlockGrid:
+    def __init__(self, cell_width=Block.WIDTH + Block.INDENT,
+                 cell_height=Block.HEIGHT + Block.INDENT):
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.cells = {}
+
+    def cells_range(self, rect):
+        return (range(rect.left // self.cell_width,
+                      (rect.right - 1) // self.cell_width + 1),
+                range(rect.top // self.cell_height,
+                      (rect.bottom - 1) // self.cell_height + 1))
+
+    def insert(self, key, rect):
+        columns, rows = self.cells_range(rect)
+        for i in columns:
+            for j in rows:
+                self.cells.setdefault((i, j), []).append(key)
+
+    def remove(self, key, rect):
+        columns, rows = self.cells_range(rect)
+        for i in columns:
+            for j in rows:
+                cell = self.cells[(i, j)]
+                cell.remove(key)
+                if not cell:
+                    del self.cells[(i, j)]
+
+    def query(self, rect):
+        candidates = set()
+        columns, rows = self.cells_range(rect)
+        for i in columns:
+            for j in rows:
+                cell = self.cells.get((i, j))
+                if cell:
+                    candidates.update(cell)
+        return candidates
+
+    def clear(self):
+        self.cells.clear()
+
+
+class BlockStore:
+    KINDS = (Block, ConcreteBlock, IronBlock)
+    TEXTURES = Block.IMAGE_NAMES + (ConcreteBlock.HITTED_IMAGE_NAME,) + \
+        IronBlock.IMAGE_NAMES + Block.TEXTURE_NAMES[len(Block.IMAGE_NAMES):]
+    TEXTURE_INDEXES = {name: i for i, name in enumerate(TEXTURES)}
+    STATE = struct.Struct("<IHH")
+
+    def __init__(self, rng=random, cell_size=None):
+        Allocations.count("block_stores")
+        self.random = rng
+        self.x = array("h")
+        self.y = array("h")
+        self.w = array("H")
+        self.h = array("H")
+        self.kind = array("B")
+        self.hardness = array("b")
+        self.texture = array("B")
+        self.alive = array("B")
+        self.alive_count = 0
+        self.breakable_count = 0
+        self.bounds = None
+        self.grid = BlockGrid() if cell_size is None else BlockGrid(*cell_size)
+
+    def reset(self, rng=random, cell_size=None):
+        self.random = rng
+        for values in self.get_arrays():
+            del values[:]
+        self.alive_count = 0
+        self.breakable_count = 0
+        self.bounds = None
+        if cell_size is not None:
+            self.grid.cell_width, self.grid.cell_height = cell_size
+        self.grid.clear()
+
+    def add(self, kind, x, y, width=Block.WIDTH, height=Block.HEIGHT,
+            hardness=None, texture=None):
+        if hardness is None:
+            hardness = kind.HARDNESS
+        if texture is None:
+            texture = self.random.choice(kind.IMAGE_NAMES)
+        index = len(self.alive)
+        self.x.append(x)
+        self.y.append(y)
+        self.w.append(width)
+        self.h.append(height)
+        self.kind.append(self.KINDS.index(kind))
+        self.hardness.append(hardness)
+        self.texture.append(self.TEXTURE_INDEXES[texture])
+        self.alive.append(1)
+        self.alive_count += 1
+        self.breakable_count += kind.BREAKABLE
+        self.bounds = None
+        self.grid.insert(index, self.get_rect(index))
+        return index
+
+    def remove(self, index):
+        if self.alive[index]:
+            self.alive[index] = 0
+            self.alive_count -= 1
+            self.breakable_count -= self.get_kind(index).BREAKABLE
+            self.grid.remove(index, self.get_rect(index))
+
+    def hit(self, index):
+        self.hardness[index] -= 1
+        self.texture[index] = \
+            self.TEXTURE_INDEXES[ConcreteBlock.HITTED_IMAGE_NAME]
+
+    def get_block_state(self, index):
+        return self.hardness[index], self.texture[index], self.alive[index]
+
+    def set_block_state(self, index, hardness, texture, alive):
+        if alive and not self.alive[index]:
+            self.alive[index] = 1
+            self.alive_count += 1
+            self.breakable_count += self.get_kind(index).BREAKABLE
+            self.grid.insert(index, self.get_rect(index))
+        elif not alive:
+            self.remove(index)
+        self.hardness[index] = hardness
+        self.texture[index] = texture
+
+    def get_rect(self, index):
+        return pygame.Rect(self.x[index], self.y[index],
+                           self.w[index], self.h[index])
+
+    def get_kind(self, index):
+        return self.KINDS[self.kind[index]]
+
+    def get_hardness(self, index):
+        return self.hardness[index]
+
+    def is_alive(self, index):
+        return bool(self.alive[index])
+
+    def get_capacity(self):
+        return len(self.alive)
+
+    def get_breakable_count(self):
+        return self.breakable_count
+
+    def get_bounds(self):
+        if self.bounds is None and self.alive:
+            self.bounds = self.get_rect(0).unionall(
+                [self.get_rect(i) for i in range(1, len(self.alive))])
+        return self.bounds
+
+    def query(self, rect):
+        return sorted(self.grid.query(rect))
+
+    def get_blit(self, index, viewport=None):
+        rect = self.get_rect(index)
+        if viewport is None:
+            atlas = TextureAtlas.get(rect.size)
+        else:
+            rect = viewport.to_window_rect(rect)
+            atlas = viewport.get_atlas(rect.size)
+        return atlas.image, rect, atlas.get_area(self.texture[index])
+
+    def draw(self, surf, index, viewport=None):
+        return surf.blit(*self.get_blit(index, viewport))
+
+    def draw_all(self, surf, viewport=None):
+        surf.blits([self.get_blit(index, viewport) for index in self],
+                   doreturn=False)
+
+    def get_arrays(self):
+        return (self.x, self.y, self.w, self.h, self.kind, self.hardness,
+                self.texture, self.alive)
+
+    def get_state(self):
+        state = [self.STATE.pack(len(self.alive), self.grid.cell_width,
+                                 self.grid.cell_height)]
+        for values in self.get_arrays():
+            if sys.byteorder == "big" and values.itemsize > 1:
+                values = array(values.typecode, values)
+                values.byteswap()
+            state.append(values.tobytes())
+        return b"".join(state)
+
+    def set_state(self, data, offset=0):
+        count, cell_width, cell_height = self.STATE.unpack_from(data, offset)
+        offset += self.STATE.size
+        for values in self.get_arrays():
+            del values[:]
+            size = count * values.itemsize
+            values.frombytes(data[offset:offset + size])
+            if sys.byteorder == "big" and values.itemsize > 1:
+                values.byteswap()
+            offset += size
+        self.alive_count = sum(self.alive)
+        self.breakable_count = sum(self.get_kind(index).BREAKABLE
+                                   for index in self)
+        self.bounds = None
+        self.grid.cell_width, self.grid.cell_height = cell_width, cell_height
+        self.grid.clear()
+        for index in self:
+            self.grid.insert(index, self.get_rect(index))
+        return offset
+
+    def __len__(self):
+        return self.alive_count
+
+    def __iter__(self):
+        return (i for i, alive in enumerate(self.alive) if alive)
+
+
+class TextureAtlas:
+    IMAGE_NAME = "block_atlas.png"
+    INDEX_NAME = "block_atlas.json"
+    CELL_SIZE = (Block.WIDTH, Block.HEIGHT)
+    COLUMNS = 8
+    atlases = {}
+
+    def __init__(self, image, areas):
+        self.image = image
+        self.areas = areas
+
+    def get_area(self, texture):
+        return self.areas[texture]
+
+    def scale(self, size, smooth=True):
+        scale = pygame.transform.smoothscale if smooth else \
+            pygame.transform.scale
+        image = pygame.Surface(self.get_image_size(len(self.areas),
+                                                   size)).convert()
+        areas = []
+        for i, area in enumerate(self.areas):
+            cell = self.get_cell(i, size)
+            image.blit(scale(self.image.subsurface(area), size), cell)
+            areas.append(cell)
+        return TextureAtlas(image, areas)
+
+    @classmethod
+    def get(cls, size=CELL_SIZE, smooth=True):
+        key = size if size == cls.CELL_SIZE else (size, smooth)
+        atlas = cls.atlases.get(key)
+        if atlas is None:
+            if size == cls.CELL_SIZE:
+                atlas = cls.load()
+            else:
+                atlas = cls.get().scale(size, smooth)
+            cls.atlases[key] = atlas
+        return atlas
+
+    @classmethod
+    def load(cls):
+        index = {}
+        index_path = os.path.join("data", cls.INDEX_NAME)
+        if os.path.isfile(index_path):
+            with open(index_path) as file:
+                index = json.load(file)
+        textures = index.get("textures", {})
+        if index.get("cell_size") != list(cls.CELL_SIZE) or \
+                any(name not in textures for name in BlockStore.TEXTURES):
+            image, index = cls.build()
+            textures = index["textures"]
+        else:
+            image = AssetCache.decoded_images.get(cls.IMAGE_NAME)
+            if image is None:
+                image = GameWindow.decode_image(cls.IMAGE_NAME)
+        return cls(image.convert(), [pygame.Rect(textures[name])
+                                     for name in BlockStore.TEXTURES])
+
+    @classmethod
+    def build(cls, names=BlockStore.TEXTURES):
+        image = pygame.Surface(cls.get_image_size(len(names)))
+        textures = {}
+        for i, name in enumerate(names):
+            texture = GameWindow.decode_image(name)
+            if texture.get_size() != cls.CELL_SIZE:
+                texture = pygame.transform.smoothscale(texture, cls.CELL_SIZE)
+            cell = cls.get_cell(i)
+            image.blit(texture, cell)
+            textures[name] = list(cell)
+        return image, {"cell_size": list(cls.CELL_SIZE), "textures": textures}
+
+    @classmethod
+    def save(cls, directory="data"):
+        image, index = cls.build()
+        pygame.image.save(image, os.path.join(directory, cls.IMAGE_NAME))
+        with open(os.path.join(directory, cls.INDEX_NAME), "w") as file:
+            json.dump(index, file, indent=4)
+        return image, index
+
+    @classmethod
+    def get_cell(cls, i, size=CELL_SIZE):
+        return pygame.Rect(i % cls.COLUMNS * size[0],
+                           i // cls.COLUMNS * size[1], *size)
+
+    @classmethod
+    def get_image_size(cls, count, size=CELL_SIZE):
+        return cls.COLUMNS * size[0], -(-count // cls.COLUMNS) * size[1]
+
+    @classmethod
+    def clear(cls):
+        cls.atlases.clear()
+
+
+class FrameProfiler:
+    HISTORY_SIZE = 600
+    DROPPED_FRAME_RATIO = 1.5
+    OVERLAY_UPDATE_FRAMES = 30
+    OVERLAY_FONT_SIZE = 24
+    OVERLAY_COLOR = (255, 255, 0)
+    OVERLAY_BACKGROUND = (0, 0, 0)
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, fps):
+        self.frame_budget = 1 / fps
+        self.frames = deque(maxlen=self.HISTORY_SIZE)
+        self.current = {}
+        self.frame_start = None
+        self.frames_count = 0
+        self.dropped_frames = 0
+        self.overlay_enabled = False
+        self.overlay = None
+        self.start_time = time.perf_counter()
+        self.first_frame_time = None
+        self.latencies = deque(maxlen=self.HISTORY_SIZE)
+
+    @contextmanager
+    def section(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.current[name] = self.current.get(name, 0) + \
+                time.perf_counter() - start
+
+    def start_frame(self):
+        self.current = {}
+        self.frame_start = time.perf_counter()
+
+    def end_frame(self):
+        frame_time = time.perf_counter() - self.frame_start
+        self.current["frame"] = frame_time
+        self.frames.append(self.current)
+        self.frames_count += 1
+        if frame_time > self.frame_budget * self.DROPPED_FRAME_RATIO:
+            self.dropped_frames += 1
+        if self.overlay_enabled and \
+                self.frames_count % self.OVERLAY_UPDATE_FRAMES == 0:
+            self.overlay = None
+
+    def toggle_overlay(self):
+        self.overlay_enabled = not self.overlay_enabled
+        self.overlay = None
+
+    @staticmethod
+    def percentile(values, percent):
+        if not values:
+            return 0
+        values = sorted(values)
+        return values[min(len(values) - 1,
+                          math.ceil(percent / 100 * len(values)) - 1)]
+
+    def get_section_names(self):
+        names = []
+        for frame in self.frames:
+            for name in frame:
+                if name not in names:
+                    names.append(name)
+        return names
+
+    def add_input_latency(self, latency):
+        self.latencies.append(latency)
+
+    def mark_first_frame(self):
+        if self.first_frame_time is None:
+            self.first_frame_time = time.perf_counter() - self.start_time
+
+    def get_stats(self):
+        stats = {"frames": self.frames_count,
+                 "dropped_frames": self.dropped_frames,
+                 "frame_budget_ms": self.frame_budget * 1000,
+                 "time_to_first_frame_ms": None if self.first_frame_time
+                 is None else self.first_frame_time * 1000,
+                 "audio": SoundPool.get_stats(),
+                 "allocations": Allocations.get_stats(),
+                 "sections": {}}
+        for name in self.get_section_names():
+            values = [frame.get(name, 0) * 1000 for frame in self.frames]
+            stats["sections"][name] = {
+                "p{}".format(percent): self.percentile(values, percent)
+                for percent in self.PERCENTILES}
+        latencies = [latency * 1000 for latency in self.latencies]
+        stats["input_latency_ms"] = {
+            "p{}".format(percent): self.percentile(latencies, percent)
+            for percent in self.PERCENTILES}
+        return stats
+
+    def draw_overlay(self, surf):
+        if self.overlay is None:
+            stats = self.get_stats()
+            lines = ["dropped {} / {} frames".format(
+                stats["dropped_frames"], stats["frames"])]
+            for name, values in stats["sections"].items():
+                lines.append("{}: {:.2f} / {:.2f} / {:.2f} ms".format(
+                    name, *values.values()))
+            lines.append("input latency: {:.2f} / {:.2f} / {:.2f} ms".format(
+                *stats["input_latency_ms"].values()))
+            font = TextCache.get_font(self.OVERLAY_FONT_SIZE)
+            texts = [font.render(line, True, self.OVERLAY_COLOR,
+                                 self.OVERLAY_BACKGROUND) for line in lines]
+            self.overlay = pygame.Surface(
+                (max(text.get_width() for text in texts),
+                 sum(text.get_height() for text in texts)))
+            y = 0
+            for text in texts:
+                self.overlay.blit(text, (0, y))
+                y += text.get_height()
+        return surf.blit(self.overlay, (0, 0))
+
+    def dump(self, path):
+        if path.endswith(".csv"):
+            names = self.get_section_names()
+            with open(path, "w", newline="") as file:
+                writer = csv.writer(file)
+                writer.writerow(names)
+                for frame in self.frames:
+                    writer.writerow([frame.get(name, 0) for name in names])
+        else:
+            with open(path, "w") as file:
+                json.dump({"stats": self.get_stats(),
+                           "frames": list(self.frames)}, file, indent=4)
+
+
+class Level:
+    MAGIC = b"ARKL"
+    VERSION = 2
+    HEADER = struct.Struct("<4sBHHHHHHH")
+    GRID_HEADER = "[grid]"
+    TEXTURES_HEADER = "[textures]"
+    EMPTY_CHAR = "."
+    KIND_CHARS = {"B": Block, "C": ConcreteBlock, "I": IronBlock}
+    SETTINGS = ("block_width", "block_height", "indent",
+                "incr_platform_blocks", "life_blocks")
+    POSITIVE_SETTINGS = ("block_width", "block_height",
+                         "incr_platform_blocks")
+    MAX_SETTING = 0xFFFF
+    MAX_COORD = 0x7FFF
+    MAX_HARDNESS = 0x7F
+    cache = {}
+
+    def __init__(self, columns, rows, cells, hardness,
+                 block_width=Block.WIDTH, block_height=Block.HEIGHT,
+                 indent=Block.INDENT,
+                 incr_platform_blocks=Bonus.N_BLOCKS_FOR_GET_INCR_PLATFORM,
+                 life_blocks=0, textures=None):
+        self.columns = columns
+        self.rows = rows
+        self.cells = cells
+        self.hardness = hardness
+        self.textures = bytearray(columns * rows) if textures is None \
+            else textures
+        self.block_width = block_width
+        self.block_height = block_height
+        self.indent = indent
+        self.incr_platform_blocks = incr_platform_blocks
+        self.life_blocks = life_blocks
+        self.validate()
+
+    def validate(self):
+        for name in self.SETTINGS:
+            minimum = 1 if name in self.POSITIVE_SETTINGS else 0
+            if not minimum <= getattr(self, name) <= self.MAX_SETTING:
+                raise ValueError(f"level setting '{name}' must be between "
+                                 f"{minimum} and {self.MAX_SETTING}")
+        if self.columns < 1 or self.rows < 1:
+            raise ValueError("level grid must not be empty")
+        if self.columns * (self.block_width + self.indent) > self.MAX_COORD \
+                or self.rows * (self.block_height + self.indent) > \
+                self.MAX_COORD:
+            raise ValueError(f"level grid must fit in {self.MAX_COORD} "
+                             f"pixels")
+        size = self.columns * self.rows
+        if any(len(values) != size for values in (self.cells, self.hardness,
+                                                   self.textures)):
+            raise ValueError("level cells must match the grid size")
+        if max(self.cells) > len(BlockStore.KINDS):
+            raise ValueError(f"unknown level block kind {max(self.cells)}")
+        if max(self.hardness) > self.MAX_HARDNESS:
+            raise ValueError(f"level block hardness must be at most "
+                             f"{self.MAX_HARDNESS}")
+        if max(self.textures) > len(Block.TEXTURE_NAMES):
+            raise ValueError(f"unknown level texture {max(self.textures)}")
+
+    @classmethod
+    def default(cls):
+        columns, rows = GameSimulation.M_BLOCKS, GameSimulation.N_BLOCKS
+        iron_blocks = set(GameSimulation.IRON_BLOCKS_COORDS)
+        cells = bytearray(columns * rows)
+        hardness = bytearray(columns * rows)
+        for j in range(rows):
+            for i in range(columns):
+                if (i, j) in iron_blocks:
+                    kind = IronBlock
+                elif i * j % GameSimulation.CONCRETE_BLOCK_FREQ == 0:
+                    kind = ConcreteBlock
+                else:
+                    kind = Block
+                cells[j * columns + i] = BlockStore.KINDS.index(kind) + 1
+                hardness[j * columns + i] = kind.HARDNESS
+        return cls(columns, rows, cells, hardness)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as file:
+            data = file.read()
+        digest = hashlib.sha1(data).hexdigest()
+        level = cls.cache.get(digest)
+        if level is None:
+            if data.startswith(cls.MAGIC):
+                level = cls.from_bytes(data)
+            else:
+                level = cls.from_text(data.decode("utf-8"))
+            cls.cache[digest] = level
+        return level
+
+    @classmethod
+    def from_text(cls, text):
+        settings = {}
+        sections = {}
+        section = None
+        for number, line in enumerate(text.splitlines(), 1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            if line in (cls.GRID_HEADER, cls.TEXTURES_HEADER):
+                section = sections[line] = []
+            elif section is not None:
+                section.append(line)
+            else:
+                key, _, value = (part.strip() for part in line.partition("="))
+                if key not in cls.SETTINGS:
+                    raise ValueError(f"line {number}: unknown level setting "
+                                     f"'{key}'")
+                try:
+                    settings[key] = int(value)
+                except ValueError:
+                    raise ValueError(f"line {number}: level setting '{key}' "
+                                     f"must be an integer") from None
+        grid = sections.get(cls.GRID_HEADER)
+        if not grid or any(len(row) != len(grid[0]) for row in grid):
+            raise ValueError("level grid rows must be non-empty and "
+                             "of equal length")
+
+        columns, rows = len(grid[0]), len(grid)
+        cells = bytearray(columns * rows)
+        hardness = bytearray(columns * rows)
+        for index, char in enumerate("".join(grid)):
+            if char == cls.EMPTY_CHAR:
+                continue
+            if char.isdigit():
+                kind, hardness[index] = ConcreteBlock, int(char)
+            elif char in cls.KIND_CHARS:
+                kind = cls.KIND_CHARS[char]
+                hardness[index] = kind.HARDNESS
+            else:
+                raise ValueError(f"unknown level cell '{char}'")
+            cells[index] = BlockStore.KINDS.index(kind) + 1
+        textures = None
+        if cls.TEXTURES_HEADER in sections:
+            textures = cls.textures_from_text(
+                sections[cls.TEXTURES_HEADER], columns, rows)
+        return cls(columns, rows, cells, hardness, textures=textures,
+                   **settings)
+
+    @classmethod
+    def textures_from_text(cls, lines, columns, rows):
+        if len(lines) != rows or any(len(row) != columns for row in lines):
+            raise ValueError("level textures must match the grid size")
+        textures = bytearray(columns * rows)
+        for index, char in enumerate("".join(lines)):
+            if char == cls.EMPTY_CHAR:
+                continue
+            try:
+                texture = int(char, 36)
+            except ValueError:
+                texture = 0
+            if not 1 <= texture <= len(Block.TEXTURE_NAMES):
+                raise ValueError(f"unknown level texture '{char}'")
+            textures[index] = texture
+        return textures
+
+    @classmethod
+    def from_bytes(cls, data):
+        if len(data) < cls.HEADER.size:
+            raise ValueError("truncated level file")
+        (magic, version, columns, rows, block_width, block_height, indent,
+         incr_platform_blocks, life_blocks) = cls.HEADER.unpack_from(data)
+        if not 1 <= version <= cls.VERSION:
+            raise ValueError(f"unsupported level version {version}")
+        size = columns * rows
+        offset = cls.HEADER.size
+        layers = 3 if version >= 2 else 2
+        if len(data) != offset + layers * size:
+            raise ValueError("level file size does not match its grid")
+        textures = None
+        if version >= 2:
+            textures = bytearray(data[offset + 2 * size:offset + 3 * size])
+        return cls(columns, rows, bytearray(data[offset:offset + size]),
+                   bytearray(data[offset + size:offset + 2 * size]),
+                   block_width, block_height, indent,
+                   incr_platform_blocks, life_blocks, textures)
+
+    def to_bytes(self):
+        return self.HEADER.pack(self.MAGIC, self.VERSION, self.columns,
+                                self.rows, self.block_width,
+                                self.block_height, self.indent,
+                                self.incr_platform_blocks,
+                                self.life_blocks) + \
+            bytes(self.cells) + bytes(self.hardness) + bytes(self.textures)
+
+    def copy(self):
+        return self.from_bytes(self.to_bytes())
+
+    def get_digest(self):
+        return hashlib.sha1(self.to_bytes()).digest()
+
+    @classmethod
+    def compile(cls, source_path, target_path):
+        level = cls.load(source_path)
+        with open(target_path, "wb") as file:
+            file.write(level.to_bytes())
+        return level
+
+    def build_blocks(self, rng=random, blocks=None):
+        step_x = self.block_width + self.indent
+        step_y = self.block_height + self.indent
+        if blocks is None:
+            blocks = BlockStore(rng, (step_x, step_y))
+        else:
+            blocks.reset(rng, (step_x, step_y))
+        kinds = BlockStore.KINDS
+        columns = self.columns
+        for index, kind in enumerate(self.cells):
+            if kind:
+                texture = self.textures[index]
+                blocks.add(kinds[kind - 1],
+                           index % columns * step_x, index // columns * step_y,
+                           self.block_width, self.block_height,
+                           self.hardness[index],
+                           Block.TEXTURE_NAMES[texture - 1] if texture
+                           else None)
+        return blocks
+
+
+class GameSimulation:
+    TICK_RATE = 60
+    N_BLOCKS = 8
+    M_BLOCKS = 18
+    IRON_BLOCKS_COORDS = [(0, 0),
+                          (0, N_BLOCKS - 1),
+                          (M_BLOCKS - 1, N_BLOCKS - 1),
+                          (M_BLOCKS - 1, 0),
+                          (M_BLOCKS//2 - 1, N_BLOCKS // 2 - 1),
+                          (M_BLOCKS // 2, N_BLOCKS // 2 - 1),
+                          (M_BLOCKS//2 + 1, N_BLOCKS//2 - 1),
+                          (M_BLOCKS//2 - 1, N_BLOCKS - 1),
+                          (M_BLOCKS//2, N_BLOCKS - 1),
+                          (M_BLOCKS//2 + 1, N_BLOCKS - 1)
+                          ]
+    CONCRETE_BLOCK_FREQ = 10
+    MAX_COLLISIONS_PER_STEP = 4
+    CONTACT_OFFSET = 0.001
+    BROAD_PHASE_MARGIN = 4
+
+    LOSE = 0
+    WIN = 1
+
+    BLOCK_CRASHED_EVENT = 0
+    BLOCK_HIT_EVENT = 1
+    PADDLE_TOUCH_EVENT = 2
+    BALL_LOST_EVENT = 3
+    GAME_END_EVENT = 4
+
+    SNAPSHOT_MAGIC = b"ARKS"
+    SNAPSHOT_VERSION = 1
+    SNAPSHOT_HEADER = struct.Struct("<4sBIIbHHIhh")
+    RANDOM_STATE = struct.Struct("<BBd625I")
+
+    def __init__(self, width, height, seed=None, level=None):
+        self.width = width
+        self.height = height
+        self.level = Level.default() if level is None else level
+        self.dt = 1 / self.TICK_RATE
+        self.seed = random.getrandbits(32) if seed is None else seed
+        self.profiler = None
+        self.paddle = None
+        self.blocks = None
+        self.reset()
+
+    def reset(self):
+        self.random = random.Random(self.seed)
+        self.ticks = 0
+        self.events = []
+        self.end_state = None
+        if self.paddle is None:
+            self.game_objects_initial()
+            self.blocks_placement()
+            self.score = Score(self.get_window_size())
+            self.bonus = Bonus(self.get_window_size(),
+                               self.paddle, self.balls, self.blocks,
+                               self.level.incr_platform_blocks,
+                               self.level.life_blocks)
+        else:
+            self.game_objects_reset()
+            self.blocks_placement()
+            self.score.reset()
+            self.bonus.reset()
+        self.store_previous_state()
+
+    def restart(self, seed=None):
+        self.seed = random.getrandbits(32) if seed is None else seed
+        self.reset()
+
+    def game_objects_initial(self):
+        Allocations.count("sprite_groups")
+        self.all_sprites = pygame.sprite.Group()
+        self.paddle = Paddle(self.get_window_size(), self.all_sprites,
+                             self.random)
+        self.balls = BallPool(self.get_window_size(), self.all_sprites,
+                              self.random)
+        self.objects_centering()
+
+    def game_objects_reset(self):
+        self.paddle.reset(self.random)
+        self.balls.reset(self.random)
+        self.objects_centering()
+
+    def objects_centering(self):
+        self.paddle.centering()
+        self.balls.centering(
+            *self.paddle.get_pos(),
+            self.paddle.get_width(), self.paddle.get_height())
+
+    def get_window_size(self):
+        return self.width, self.height
+
+    def get_time(self):
+        return self.ticks * self.dt
+
+    def is_finished(self):
+        return self.end_state is not None
+
+    def store_previous_state(self):
+        self.balls.store_previous_state()
+        self.prev_paddle_pos = self.paddle.get_pos()
+
+    def snapshot(self):
+        version, internal_state, gauss_next = self.random.getstate()
+        return b"".join((
+            self.SNAPSHOT_HEADER.pack(
+                self.SNAPSHOT_MAGIC, self.SNAPSHOT_VERSION, self.seed,
+                self.ticks, -1 if self.end_state is None else self.end_state,
+                self.width, self.height, self.score.get_score(),
+                *self.prev_paddle_pos),
+            self.paddle.get_state(),
+            self.balls.get_state(),
+            self.blocks.get_state(),
+            self.bonus.get_state(),
+            self.RANDOM_STATE.pack(version, gauss_next is not None,
+                                   gauss_next or 0, *internal_state)))
+
+    def restore(self, data):
+        if len(data) < self.SNAPSHOT_HEADER.size + self.RANDOM_STATE.size:
+            raise ValueError("truncated game snapshot")
+        header = self.SNAPSHOT_HEADER.unpack_from(data)
+        magic, version = header[:2]
+        if magic != self.SNAPSHOT_MAGIC or version != self.SNAPSHOT_VERSION:
+            raise ValueError("not a supported game snapshot")
+        width, height = header[5:7]
+        if (width, height) != self.get_window_size():
+            raise ValueError("snapshot window size {}x{} does not match "
+                             "{}x{}".format(width, height,
+                                            *self.get_window_size()))
+        backup = self.snapshot()
+        try:
+            self.set_snapshot_state(data)
+        except (ValueError, IndexError, struct.error) as error:
+            self.set_snapshot_state(backup)
+            raise ValueError(f"corrupt game snapshot: {error}") from error
+
+    def set_snapshot_state(self, data):
+        (_, _, seed, ticks, end_state, _, _, score,
+         *prev_paddle_pos) = self.SNAPSHOT_HEADER.unpack_from(data)
+        self.seed = seed
+        self.ticks = ticks
+        self.end_state = None if end_state < 0 else end_state
+        self.score.set_score(score)
+        self.prev_paddle_pos = tuple(prev_paddle_pos)
+        self.events = []
+        offset = self.paddle.set_state(data, self.SNAPSHOT_HEADER.size)
+        offset = self.balls.set_state(data, offset)
+        offset = self.blocks.set_state(data, offset)
+        offset = self.bonus.set_state(data, offset)
+        if offset + self.RANDOM_STATE.size != len(data):
+            raise ValueError("game snapshot size does not match its content")
+        version, has_gauss, gauss_next, *internal_state = \
+            self.RANDOM_STATE.unpack_from(data, offset)
+        self.random.setstate((version, tuple(internal_state),
+                              gauss_next if has_gauss else None))
+
+    @classmethod
+    def from_snapshot(cls, data, level=None):
+        if len(data) < cls.SNAPSHOT_HEADER.size:
+            raise ValueError("truncated game snapshot")
+        width, height = cls.SNAPSHOT_HEADER.unpack_from(data)[5:7]
+        simulation = cls(width, height, level=level)
+        simulation.restore(data)
+        return simulation
+
+    def interpolated_positions(self, alpha):
+        balls_pos = [self.lerp(ball.prev_pos, ball.get_pos(), alpha)
+                     for ball in self.balls]
+        paddle_pos = self.lerp(self.prev_paddle_pos,
+                               self.paddle.get_pos(), alpha)
+        return balls_pos, paddle_pos
+
+    def spawn_balls(self, count):
+        self.balls.spawn(count)
+
+    def set_blocks(self, blocks):
+        self.blocks = blocks
+        self.bonus.blocks = blocks
+
+    @staticmethod
+    def lerp(start, end, alpha):
+        return (round(start[0] + (end[0] - start[0]) * alpha),
+                round(start[1] + (end[1] - start[1]) * alpha))
+
+    def step(self, direction=0):
+        self.events = []
+        if self.is_finished():
+            return self.events
+        self.store_previous_state()
+        self.ticks += 1
+        if direction:
+            self.paddle.set_direction(direction)
+            self.paddle.move()
+            self.balls.set_static(False)
+        with self.section("balls"):
+            self.balls_movement_handler()
+        with self.section("bonus"):
+            self.bonus_get_handler()
+        with self.section("win_lost"):
+            self.win_lost_detector()
+        return self.events
+
+    def section(self, name):
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.section(name)
+
+    def balls_movement_handler(self):
+        margin = self.BROAD_PHASE_MARGIN
+        right = self.width - margin
+        paddle_rect = self.paddle.rect.inflate(2 * margin, 2 * margin)
+        blocks_rect = self.blocks.get_bounds()
+        if blocks_rect is not None:
+            blocks_rect = blocks_rect.inflate(2 * margin, 2 * margin)
+        colliding = []
+        for ball in self.balls:
+            if ball.static_state():
+                continue
+            dx, dy = ball.get_velocity()
+            swept_rect = ball.rect.union(ball.rect.move(dx, dy))
+            if swept_rect.left > margin and swept_rect.right < right and \
+                    swept_rect.top > margin and \
+                    (dy <= 0 or not swept_rect.colliderect(paddle_rect)) and \
+                    (blocks_rect is None or
+                     not swept_rect.colliderect(blocks_rect)):
+                ball.move(dx, dy)
+            else:
+                colliding.append(ball)
+        for ball in colliding:
+            self.ball_movement_handler(ball)
+
+    def ball_movement_handler(self, ball):
+        remaining = 1
+        for _ in range(self.MAX_COLLISIONS_PER_STEP):
+            dx, dy = ball.get_velocity()
+            dx, dy = dx * remaining, dy * remaining
+            contact = self.find_contact(ball, dx, dy)
+            if contact is None:
+                ball.move(dx, dy)
+                return
+            t, normal, target = contact
+            ball.move(dx * t + normal[0] * self.CONTACT_OFFSET,
+                      dy * t + normal[1] * self.CONTACT_OFFSET)
+            self.collision_handler(ball, target, normal)
+            remaining *= 1 - t
+
+    def find_contact(self, ball, dx, dy):
+        contact = None
+        if dx < 0:
+            contact = self.earliest_contact(
+                contact, max(0, -ball.x / dx), (1, 0), None)
+        elif dx > 0:
+            contact = self.earliest_contact(
+                contact, max(0, (self.width - ball.x - ball.rect.w) / dx),
+                (-1, 0), None)
+        if dy < 0:
+            contact = self.earliest_contact(
+                contact, max(0, -ball.y / dy), (0, 1), None)
+
+        if dy > 0:
+            hit = ball.sweep(self.paddle.rect, dx, dy)
+            if hit is not None:
+                contact = self.earliest_contact(contact, *hit, self.paddle)
+
+        swept_rect = ball.rect.union(ball.rect.move(dx, dy)).inflate(2, 2)
+        for index in self.blocks.query(swept_rect):
+            hit = ball.sweep(self.blocks.get_rect(index), dx, dy)
+            if hit is not None:
+                contact = self.earliest_contact(contact, *hit, index)
+        return contact
+
+    @staticmethod
+    def earliest_contact(contact, t, normal, target):
+        if t > 1 or (contact is not None and contact[0] <= t):
+            return contact
+        return t, normal, target
+
+    def bonus_get_handler(self):
+        self.bonus.update(self.get_time())
+
+    def win_lost_detector(self):
+        if not self.blocks.get_breakable_count():
+            self.end_state = self.WIN
+            self.events.append((self.GAME_END_EVENT, self.WIN))
+            return
+        paddle_y = self.paddle.get_pos()[1]
+        lost_balls = [ball for ball in self.balls
+                      if ball.get_pos()[1] > paddle_y +
+                      self.paddle.get_height()]
+        for ball in lost_balls:
+            if len(self.balls) > 1:
+                self.balls.remove(ball)
+                continue
+            self.balls.decrease_lifes()
+            self.events.append((self.BALL_LOST_EVENT, ball))
+
+            if self.balls.get_lifes() <= 0:
+                self.end_state = self.LOSE
+                self.events.append((self.GAME_END_EVENT, self.LOSE))
+            else:
+                self.paddle.set_width(Paddle.WIDTH)
+                self.paddle.centering()
+                self.balls.centering(
+                    *self.paddle.get_pos(), self.paddle.get_width(),
+                    self.paddle.get_height())
+                self.store_previous_state()
+
+    def collision_handler(self, ball, target, normal):
+        if target is self.paddle:
+            self.events.append((self.PADDLE_TOUCH_EVENT, self.paddle))
+            ball.bounce(normal)
+        elif target is None:
+            ball.bounce(normal)
+        else:
+            self.blocks_collision_handler(ball, target, normal)
+
+    def blocks_placement(self):
+        self.blocks = self.level.build_blocks(self.random, self.blocks)
+
+    def blocks_collision_handler(self, ball, index, normal):
+        kind = self.blocks.get_kind(index)
+        if kind is Block or (kind is ConcreteBlock
+                             and self.blocks.get_hardness(index) == 0):
+            self.score.up_score()
+            self.blocks.remove(index)
+            self.bonus.block_crashed_handler(self.get_time())
+            self.events.append((self.BLOCK_CRASHED_EVENT, index))
+        elif kind is ConcreteBlock:
+            self.events.append((self.BLOCK_HIT_EVENT, index))
+            self.blocks.hit(index)
+        else:
+            self.events.append((self.BLOCK_HIT_EVENT, index))
+        ball.bounce(normal)
+
+
+class RewindBuffer:
+    SECONDS = 10
+    KEYFRAME_INTERVAL = 60
+    DELTA_HEADER = struct.Struct("<IIbhhBH")
+    BLOCK_CHANGE = struct.Struct("<IbBB")
+    BLOCK_EVENTS = (GameSimulation.BLOCK_CRASHED_EVENT,
+                    GameSimulation.BLOCK_HIT_EVENT)
+
+    def __init__(self, simulation, seconds=SECONDS,
+                 keyframe_interval=KEYFRAME_INTERVAL):
+        self.simulation = simulation
+        self.capacity = seconds * GameSimulation.TICK_RATE
+        self.keyframe_interval = keyframe_interval
+        self.deltas = [None] * self.capacity
+        self.keyframes = deque(maxlen=self.capacity // keyframe_interval + 2)
+        self.clear()
+
+    def clear(self):
+        self.keyframes.clear()
+        self.keyframes.append((self.simulation.ticks,
+                               self.simulation.snapshot()))
+        self.newest = self.valid_from = self.simulation.ticks
+        self.balls_count = len(self.simulation.balls)
+
+    def get_oldest(self):
+        for ticks, _ in self.keyframes:
+            if ticks >= self.valid_from:
+                return ticks
+        return self.newest
+
+    def record(self, events):
+        simulation = self.simulation
+        self.newest = simulation.ticks
+        self.valid_from = max(self.valid_from, self.newest - self.capacity)
+        if self.newest % self.keyframe_interval == 0:
+            self.keyframes.append((self.newest, simulation.snapshot()))
+        balls_count = len(simulation.balls)
+        has_random = balls_count > self.balls_count
+        self.balls_count = balls_count
+        changes = [self.BLOCK_CHANGE.pack(
+            value, *simulation.blocks.get_block_state(value))
+            for event_type, value in events
+            if event_type in self.BLOCK_EVENTS]
+        delta = [self.DELTA_HEADER.pack(
+            simulation.ticks, simulation.score.get_score(),
+            -1 if simulation.end_state is None else simulation.end_state,
+            *simulation.prev_paddle_pos, has_random, len(changes)),
+            simulation.paddle.get_state(),
+            simulation.balls.get_state(),
+            simulation.bonus.get_state()] + changes
+        if has_random:
+            version, internal_state, gauss_next = simulation.random.getstate()
+            delta.append(GameSimulation.RANDOM_STATE.pack(
+                version, gauss_next is not None, gauss_next or 0,
+                *internal_state))
+        self.deltas[self.newest % self.capacity] = b"".join(delta)
+
+    def apply_delta(self, data):
+        simulation = self.simulation
+        (simulation.ticks, score, end_state, prev_x, prev_y, has_random,
+         changes_count) = self.DELTA_HEADER.unpack_from(data)
+        simulation.score.set_score(score)
+        simulation.end_state = None if end_state < 0 else end_state
+        simulation.prev_paddle_pos = (prev_x, prev_y)
+        offset = simulation.paddle.set_state(data, self.DELTA_HEADER.size)
+        offset = simulation.balls.set_state(data, offset)
+        offset = simulation.bonus.set_state(data, offset)
+        for _ in range(changes_count):
+            simulation.blocks.set_block_state(
+                *self.BLOCK_CHANGE.unpack_from(data, offset))
+            offset += self.BLOCK_CHANGE.size
+        if has_random:
+            version, has_gauss, gauss_next, *internal_state = \
+                GameSimulation.RANDOM_STATE.unpack_from(data, offset)
+            simulation.random.setstate((version, tuple(internal_state),
+                                        gauss_next if has_gauss else None))
+
+    def rewind_to(self, ticks):
+        ticks = max(self.get_oldest(), min(ticks, self.newest))
+        while self.keyframes[-1][0] > ticks:
+            self.keyframes.pop()
+        keyframe_ticks, snapshot = self.keyframes[-1]
+        self.simulation.set_snapshot_state(snapshot)
+        for tick in range(keyframe_ticks + 1, ticks + 1):
+            self.apply_delta(self.deltas[tick % self.capacity])
+        self.simulation.events = []
+        self.newest = ticks
+        self.balls_count = len(self.simulation.balls)
+        return ticks
+
+    def rewind(self, steps):
+        return self.rewind_to(self.newest - steps)
+
+
+class InputRecording:
+    MAGIC = b"ARKR"
+    VERSION = 3
+    DIRECTION_STEPS = {1: 1, 2: 127, 3: 127}
+    LEVEL_DIGEST_VERSION = 3
+    HEADER = struct.Struct("<4sBIHHH")
+    LEVEL_DIGEST = struct.Struct("<20s")
+    RUN = struct.Struct("<bI")
+
+    def __init__(self, seed, width, height,
+                 tick_rate=GameSimulation.TICK_RATE, version=VERSION,
+                 level_digest=None):
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.tick_rate = tick_rate
+        self.version = version
+        self.level_digest = level_digest
+        self.steps = self.DIRECTION_STEPS[version]
+        self.runs = []
+
+    def record(self, direction):
+        value = round(direction * self.steps)
+        if self.runs and self.runs[-1][0] == value:
+            self.runs[-1][1] += 1
+        else:
+            self.runs.append([value, 1])
+
+    def inputs(self):
+        for value, count in self.runs:
+            direction = value / self.steps
+            for _ in range(count):
+                yield direction
+
+    def get_ticks(self):
+        return sum(count for _, count in self.runs)
+
+    def save(self, path):
+        with open(path, "wb") as file:
+            file.write(self.HEADER.pack(self.MAGIC, self.version, self.seed,
+                                        self.width, self.height,
+                                        self.tick_rate))
+            if self.version >= self.LEVEL_DIGEST_VERSION:
+                file.write(self.LEVEL_DIGEST.pack(self.level_digest))
+            for direction, count in self.runs:
+                file.write(self.RUN.pack(direction, count))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as file:
+            data = file.read()
+        magic, version, seed, width, height, tick_rate = \
+            cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC or version not in cls.DIRECTION_STEPS:
+            raise ValueError(f"'{path}' is not a supported input recording")
+        offset = cls.HEADER.size
+        level_digest = None
+        if version >= cls.LEVEL_DIGEST_VERSION:
+            level_digest, = cls.LEVEL_DIGEST.unpack_from(data, offset)
+            offset += cls.LEVEL_DIGEST.size
+        recording = cls(seed, width, height, tick_rate, version,
+                        level_digest)
+        recording.runs = [list(run) for run in cls.RUN.iter_unpack(
+            data[offset:])]
+        return recording
+
+    def replay(self, profiler=None, level=None):
+        if self.tick_rate != GameSimulation.TICK_RATE:
+            raise ValueError("recording tick rate {} does not match "
+                             "simulation tick rate {}".format(
+                                 self.tick_rate, GameSimulation.TICK_RATE))
+        if level is None:
+            level = Level.default()
+        if self.level_digest is not None and \
+                self.level_digest != level.get_digest():
+            raise ValueError("recording was made on a different level")
+        simulation = GameSimulation(self.width, self.height, self.seed,
+                                    level)
+        simulation.profiler = profiler
+        for direction in self.inputs():
+            simulation.step(direction)
+        return simulation
+
+
+class Viewport:
+    SMOOTH = "smooth"
+    INTEGER = "integer"
+    MODES = (SMOOTH, INTEGER)
+
+    def __init__(self, window, logical_size, mode=SMOOTH):
+        self.window = window
+        self.logical_size = logical_size
+        self.mode = mode
+        width, height = window.get_size()
+        scale = min(width / logical_size[0], height / logical_size[1])
+        if mode == self.INTEGER and scale >= 1:
+            scale = int(scale)
+        self.scale = scale
+        self.size = (round(logical_size[0] * scale),
+                     round(logical_size[1] * scale))
+        self.offset = ((width - self.size[0]) // 2,
+                       (height - self.size[1]) // 2)
+        self.is_identity = self.size == (width, height) and scale == 1
+        if self.is_identity:
+            self.surface = window
+        else:
+            self.surface = pygame.Surface(logical_size).convert()
+
+    def scale_length(self, length):
+        return max(1, round(length * self.scale))
+
+    def scale_size(self, size):
+        return self.scale_length(size[0]), self.scale_length(size[1])
+
+    def to_window_pos(self, pos):
+        return (self.offset[0] + round(pos[0] * self.scale),
+                self.offset[1] + round(pos[1] * self.scale))
+
+    def to_window_rect(self, rect):
+        left, top = self.to_window_pos(rect.topleft)
+        right, bottom = self.to_window_pos(rect.bottomright)
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    def to_logical_pos(self, pos):
+        return (round((pos[0] - self.offset[0]) / self.scale),
+                round((pos[1] - self.offset[1]) / self.scale))
+
+    def get_image(self, name, size):
+        return AssetCache.get_scaled_image(name, size,
+                                           self.mode == self.SMOOTH)
+
+    def get_atlas(self, size):
+        return TextureAtlas.get(size, self.mode == self.SMOOTH)
+
+    def present(self):
+        if not self.is_identity:
+            scale = pygame.transform.smoothscale \
+                if self.mode == self.SMOOTH else pygame.transform.scale
+            self.window.blit(scale(self.surface, self.size), self.offset)
+        pygame.display.flip()
+
+
+class InputSampler:
+    DIRECTION_STEPS = InputRecording.DIRECTION_STEPS[InputRecording.VERSION]
+    JOYSTICK_AXIS = 0
+    JOYSTICK_DEAD_ZONE = 0.15
+    LEFT_KEYS = (pygame.K_LEFT, pygame.K_a)
+    RIGHT_KEYS = (pygame.K_RIGHT, pygame.K_d)
+    KEY_EVENTS = (pygame.KEYDOWN, pygame.KEYUP)
+    MOTION_EVENTS = (pygame.MOUSEMOTION, pygame.JOYAXISMOTION)
+
+    def __init__(self, viewport=None):
+        self.viewport = viewport
+        if not pygame.joystick.get_init():
+            pygame.joystick.init()
+        self.joysticks = [pygame.joystick.Joystick(i)
+                          for i in range(pygame.joystick.get_count())]
+        self.is_mouse_control = False
+        self.direction = 0
+        self.poll_time = None
+        self.input_time = None
+        self.sample_time = None
+
+    def handle_event(self, event):
+        if event.type in self.KEY_EVENTS:
+            if event.key not in self.LEFT_KEYS + self.RIGHT_KEYS:
+                return
+            self.is_mouse_control = False
+        elif event.type in self.MOTION_EVENTS:
+            if event.type == pygame.MOUSEMOTION:
+                self.is_mouse_control = True
+        else:
+            return
+        if self.input_time is None:
+            self.input_time = time.perf_counter() if self.poll_time is None \
+                else self.poll_time
+
+    def polled(self):
+        self.poll_time = time.perf_counter()
+
+    def sample(self, paddle):
+        keys = pygame.key.get_pressed()
+        direction = any(keys[key] for key in self.RIGHT_KEYS) - \
+            any(keys[key] for key in self.LEFT_KEYS)
+        if not direction:
+            direction = self.joystick_direction()
+        if not direction and self.is_mouse_control:
+            mouse_pos = pygame.mouse.get_pos()
+            if self.viewport is not None:
+                mouse_pos = self.viewport.to_logical_pos(mouse_pos)
+            offset = mouse_pos[0] - paddle.rect.centerx
+            direction = max(-1, min(1, offset / paddle.speed))
+        self.direction = round(direction * self.DIRECTION_STEPS) / \
+            self.DIRECTION_STEPS
+        self.sample_time = time.perf_counter()
+        return self.direction
+
+    def joystick_direction(self):
+        for joystick in self.joysticks:
+            if joystick.get_numaxes() > self.JOYSTICK_AXIS:
+                value = joystick.get_axis(self.JOYSTICK_AXIS)
+                if abs(value) > self.JOYSTICK_DEAD_ZONE:
+                    return value
+        return 0
+
+    def presented(self):
+        if self.input_time is None or self.sample_time is None or \
+                self.sample_time < self.input_time:
+            return None
+        latency = time.perf_counter() - self.input_time
+        self.input_time = None
+        return latency
+
+    def reset(self):
+        self.direction = 0
+        self.poll_time = None
+        self.input_time = None
+        self.sample_time = None
+
+
+class GameWindow:
+    FPS = 60
+    MAX_FRAME_TIME = 0.25
+    PROFILER_OVERLAY_KEY = pygame.K_F3
+    QUICK_SAVE_KEY = pygame.K_F5
+    QUICK_LOAD_KEY = pygame.K_F9
+    QUICK_SAVE_PATH = "quicksave.bin"
+    REWIND_KEY = pygame.K_BACKSPACE
+    REWIND_STEPS = 2
+    BACKGROUND_NAME = "game_background.jpg"
+    WIN_SOUND_NAME = "win_sound.wav"
+    LOSE_SOUND_NAME = "lose_sound.mp3"
+
+    LOSE = GameSimulation.LOSE
+    WIN = GameSimulation.WIN
+
+    def __init__(self, width, height, screen, profiler=None,
+                 record_path=None, level=None, viewport=None):
+        self.width = width
+        self.height = height
+        self.opened_menu = None
+        self.screen = screen
+        self.viewport = viewport or Viewport(screen, (width, height))
+        self.profiler = profiler or FrameProfiler(self.FPS)
+        self.record_path = record_path
+        self.recording = None
+        self.level = level
+        self.simulation = None
+        self.pause_menu = None
+        self.input_sampler = None
+        self.rewind = None
+
+    def ui_initial(self):
+        self.is_game_volumes_on = self.opened_menu.game_volumes_state()
+        self.pause = False
+        if self.input_sampler is None:
+            self.input_sampler = InputSampler(self.viewport)
+        self.input_sampler.reset()
+        self.clock = pygame.time.Clock()
+        if self.pause_menu is None or self.pause_menu.volume_control is not \
+                self.opened_menu.volume_control:
+            self.pause_menu = PauseMenu(
+                self.width, self.height,
+                self.viewport.surface, self,
+                self.opened_menu.volume_control)
+        self.set_menu(self.pause_menu)
+
+    def game_objects_initial(self):
+        if self.simulation is None:
+            self.simulation = GameSimulation(self.width, self.height,
+                                             level=self.level)
+            self.simulation.profiler = self.profiler
+        else:
+            self.simulation.restart()
+        if self.rewind is None:
+            self.rewind = RewindBuffer(self.simulation)
+        else:
+            self.rewind.clear()
+        self.recording = InputRecording(
+            self.simulation.seed, self.width, self.height,
+            level_digest=self.simulation.level.get_digest())
+        self.paddle = self.simulation.paddle
+        self.balls = self.simulation.balls
+        self.blocks = self.simulation.blocks
+        self.score = self.simulation.score
+
+    def background_layer_initial(self):
+        self.game_background = self.viewport.get_image(
+            self.BACKGROUND_NAME, self.viewport.scale_size(
+                AssetCache.get_image(self.BACKGROUND_NAME).get_size()))
+        self.background_pos = self.viewport.to_window_pos((0, 0))
+        self.background_layer = pygame.Surface(
+            self.screen.get_size()).convert()
+        self.background_layer.fill((0, 0, 0))
+        self.background_layer.blit(self.game_background, self.background_pos)
+        self.blocks_draw(self.background_layer)
+        EffectSprites.prerender(self.viewport)
+        self.dirty_rects = []
+        self.previous_rects = []
+        self.full_redraw = True
+
+    def invalidate_block(self, index):
+        rect = self.viewport.to_window_rect(self.blocks.get_rect(index))
+        self.background_layer.fill((0, 0, 0), rect)
+        self.background_layer.blit(
+            self.game_background, rect,
+            rect.move(-self.background_pos[0], -self.background_pos[1]))
+        if self.blocks.is_alive(index):
+            self.blocks.draw(self.background_layer, index, self.viewport)
+        self.dirty_rects.append(rect)
+
+    def start_game(self):
+        self.game_objects_initial()
+        self.ui_initial()
+        self.background_layer_initial()
+        self.clock.tick()
+
+        self.running = True
+        accumulator = 0
+
+        while self.running:
+            self.profiler.start_frame()
+            with self.profiler.section("wait"):
+                frame_time = self.clock.tick(GameWindow.FPS) / 1000
+            with self.profiler.section("events"):
+                self.events_handler()
+            if not self.pause and pygame.key.get_pressed()[self.REWIND_KEY]:
+                self.rewind_handler()
+                accumulator = 0
+                self.update_game_loop()
+                self.profiler.end_frame()
+            elif not self.pause:
+                accumulator += min(frame_time, self.MAX_FRAME_TIME)
+                while self.running and accumulator >= self.simulation.dt:
+                    direction = self.input_sampler.sample(self.paddle)
+                    if self.recording is not None:
+                        self.recording.record(direction)
+                    events = self.simulation.step(direction)
+                    self.rewind.record(events)
+                    self.simulation_events_handler(events)
+                    accumulator -= self.simulation.dt
+                if self.running:
+                    self.update_game_loop(accumulator / self.simulation.dt)
+                    self.profiler.end_frame()
+            else:
+                self.pause_menu.draw()
+                self.input_sampler.reset()
+                self.full_redraw = True
+                self.clock.tick()
+                accumulator = 0
+
+    def simulation_events_handler(self, events):
+        for event_type, value in events:
+            if event_type == GameSimulation.BLOCK_CRASHED_EVENT:
+                self.blocks.get_kind(value).play_crashed_effect(
+                    self.is_game_volumes_on)
+                self.invalidate_block(value)
+            elif event_type == GameSimulation.BLOCK_HIT_EVENT:
+                self.blocks.get_kind(value).play_hit_effect(
+                    self.is_game_volumes_on)
+                self.invalidate_block(value)
+            elif event_type == GameSimulation.PADDLE_TOUCH_EVENT:
+                value.play_touch_effect(self.is_game_volumes_on)
+            elif event_type == GameSimulation.GAME_END_EVENT:
+                self.play_game_end_effect(value)
+                self.save_recording()
+                self.game_end()
+
+    def update_game_loop(self, alpha=1):
+        self.is_game_volumes_on = self.opened_menu.game_volumes_state()
+        balls_pos, paddle_pos = self.simulation.interpolated_positions(alpha)
+        with self.profiler.section("draw"):
+            if self.full_redraw:
+                self.screen.blit(self.background_layer, (0, 0))
+            else:
+                for rect in self.previous_rects + self.dirty_rects:
+                    self.screen.blit(self.background_layer, rect, rect)
+            viewport = self.viewport
+            rects = [self.score.draw(self.screen, viewport),
+                     self.balls.draw_lifes(self.screen, viewport),
+                     self.paddle.draw(self.screen, paddle_pos, viewport)]
+            for ball, ball_pos in zip(self.balls, balls_pos):
+                rects.append(ball.draw(self.screen, ball_pos, viewport))
+            if self.profiler.overlay_enabled:
+                rects.append(self.profiler.draw_overlay(self.screen))
+        with self.profiler.section("flip"):
+            if self.full_redraw:
+                pygame.display.update()
+            else:
+                pygame.display.update(self.previous_rects +
+                                      self.dirty_rects + rects)
+        latency = self.input_sampler.presented()
+        if latency is not None:
+            self.profiler.add_input_latency(latency)
+        self.previous_rects = rects
+        self.dirty_rects = []
+        self.full_redraw = False
+
+    def play_game_end_effect(self, state):
+        if self.is_game_volumes_on:
+            if state == self.WIN:
+                SoundPool.play(self.WIN_SOUND_NAME, SoundPool.GAME_END)
+            else:
+                SoundPool.play(self.LOSE_SOUND_NAME, SoundPool.GAME_END)
+
+    def get_window_size(self):
+        return self.width, self.height
+
+    def save_recording(self):
+        if self.record_path is not None and self.recording is not None:
+            self.recording.save(self.record_path)
+
+    def quick_save(self):
+        with open(self.QUICK_SAVE_PATH, "wb") as file:
+            file.write(self.simulation.snapshot())
+
+    def quick_load(self):
+        if not os.path.isfile(self.QUICK_SAVE_PATH):
+            return
+        with open(self.QUICK_SAVE_PATH, "rb") as file:
+            data = file.read()
+        try:
+            self.simulation.restore(data)
+        except ValueError as error:
+            print(f"Quick save '{self.QUICK_SAVE_PATH}' ignored: {error}")
+            return
+        self.recording = None
+        self.rewind.clear()
+        self.input_sampler.reset()
+        self.background_layer_initial()
+
+    def rewind_handler(self):
+        ticks = self.simulation.ticks
+        blocks = self.blocks
+        states = [blocks.get_block_state(i)
+                  for i in range(blocks.get_capacity())]
+        if self.rewind.rewind(self.REWIND_STEPS) == ticks:
+            return
+        self.recording = None
+        self.input_sampler.reset()
+        if blocks is not self.simulation.blocks or \
+                blocks.get_capacity() != len(states):
+            self.blocks = self.simulation.blocks
+            self.background_layer_initial()
+            return
+        for i, state in enumerate(states):
+            if blocks.get_block_state(i) != state:
+                self.invalidate_block(i)
+        self.full_redraw = True
+
+    def blocks_draw(self, surf):
+        self.blocks.draw_all(surf, self.viewport)
+
+    def pause_handler(self):
+        self.pause = not self.pause
+
+    def events_handler(self):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.running = False
+                sys.exit(0)
+            self.input_sampler.handle_event(event)
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    self.pause_handler()
+                elif event.key == self.PROFILER_OVERLAY_KEY:
+                    self.profiler.toggle_overlay()
+                elif event.key == self.QUICK_SAVE_KEY:
+                    self.quick_save()
+                elif event.key == self.QUICK_LOAD_KEY:
+                    self.quick_load()
+        self.input_sampler.polled()
+
+    def set_menu(self, menu):
+        self.opened_menu = menu
+
+    def game_end(self):
+        self.screen.fill((0, 0, 0))
+        self.running = False
+
+    @staticmethod
+    def load_image(name, colorkey=None, image=None):
+        if image is None:
+            image = GameWindow.decode_image(name)
+        if colorkey is not None:
+            image = image.convert()
+            if colorkey == -1:
+                colorkey = image.get_at((0, 0))
+            image.set_colorkey(colorkey)
+        else:
+            image = image.convert_alpha()
+        return image
+
+    @staticmethod
+    def decode_image(name):
+        fullname = os.path.join("data", name)
+        if not os.path.isfile(fullname):
+            print(f"Файл с изображением '{fullname}' не найден")
+            sys.exit()
+        return pygame.image.load(fullname)
+
+
+class VolumeControl:
+    VOLUME_IMG_WIDTH = 64
+    VOLUME_IMG_HEIGHT = 64
+
+    def __init__(self, game_window, screen, up_btn_h):
+        self.screen = screen
+        self.width, self.height = game_window.get_window_size()
+        self.clicks = 0
+        self.mute_img = AssetCache.get_image("mute.png")
+        self.unmute_img = AssetCache.get_image("unmute.png")
+        self.volume_control_img_rect = pygame.Rect((self.width -
+                                                    self.VOLUME_IMG_WIDTH)//2,
+                                                   self.height//2 -
+                                                   up_btn_h -
+                                                   self.VOLUME_IMG_HEIGHT,
+                                                   self.VOLUME_IMG_WIDTH,
+                                                   self.VOLUME_IMG_HEIGHT)
+
+    def draw(self):
+        if self.clicks % 2 == 0:
+            self.screen.blit(self.mute_img, self.volume_control_img_rect)
+        else:
+            self.screen.blit(self.unmute_img, self.volume_control_img_rect)
+
+    def click_handler(self):
+        self.clicks += 1
+        self.clicks = self.clicks % 2
+
+    def is_volume_on(self):
+        return self.clicks % 2 == 0
+
+    def is_point_in(self, x, y):
+        return self.volume_control_img_rect.collidepoint(x, y)
+
+
+class Menu:
+    FONT_SIZE = 36
+    TEMPLATE = "You {} with score: {}"
+    Y_INDENT_COEFF = 0.95
+    FONT_PX_COEFF = 3
+    START_BUTTON = 0
+    QUIT_BUTTON = 1
+    MUTE_UNMUTE_BUTTON = 2
+    EVENT_WAIT_TIMEOUT = 500
+    BTN_SELECT_SOUND_NAME = "menu_selection_click.wav"
+    BACKGROUND_NAME = "menu_background.jpg"
+    LOADING_TEMPLATE = "Loading {:.0%}"
+    ASSETS_PROGRESS_EVENT = pygame.event.custom_type()
+    REDRAW_EVENTS = (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED,
+                     pygame.WINDOWRESTORED, pygame.WINDOWSIZECHANGED,
+                     ASSETS_PROGRESS_EVENT)
+
+    def __init__(self, width, height, screen,
+                 game_window, score=None, end_state=None, volume_control=None):
+        self.font = TextCache.get_font(Score.FONT_SIZE)
+        self.end_state = end_state
+        self.score = score
+        self.width = width
+        self.height = height
+        self.screen = screen
+        self.game_window = game_window
+        self.start_btn_font = AssetCache.get_image("play_button.png")
+        self.start_btn_rect = pygame.Rect((self.width -
+                                           self.start_btn_font.get_width())//2,
+                                          (self.height -
+                                           self.start_btn_font.get_height())//2,
+                                          *self.start_btn_font.get_size())
+        self.quit_btn_font = AssetCache.get_image("quit_button.png")
+        self.quit_btn_rect = pygame.Rect((self.width -
+                                          self.quit_btn_font.get_width())//2,
+                                         (self.height +
+                                          self.quit_btn_font.get_height())//2,
+                                         *self.quit_btn_font.get_size())
+        self.selected_btn = None
+        if volume_control is None:
+            self.volume_control = VolumeControl(
+                self.game_window, self.screen,
+                self.start_btn_font.get_height())
+        else:
+            self.volume_control = volume_control
+
+    def draw(self):
+        self.running = True
+        self.needs_redraw = True
+        self.game_window.set_menu(self)
+        while self.running:
+            state = self.menu_state()
+            self.events_handler()
+            if self.running and \
+                    (self.needs_redraw or state != self.menu_state()):
+                self.update_menu_loop()
+                self.needs_redraw = False
+
+    def menu_state(self):
+        return (self.selected_btn, self.volume_control.is_volume_on(),
+                self.score, self.end_state)
+
+    def get_events(self):
+        event = pygame.event.wait(self.EVENT_WAIT_TIMEOUT)
+        if event.type == pygame.NOEVENT:
+            return []
+        events = [event] + pygame.event.get()
+        viewport = self.game_window.viewport
+        if not viewport.is_identity:
+            for event in events:
+                if hasattr(event, "pos"):
+                    event.pos = viewport.to_logical_pos(event.pos)
+        if any(event.type in self.REDRAW_EVENTS for event in events):
+            self.needs_redraw = True
+        return events
+
+    def update_menu_loop(self):
+        self.screen.fill((0, 0, 0))
+        background = AssetCache.peek_image(self.BACKGROUND_NAME)
+        if background is not None:
+            self.screen.blit(background, background.get_rect())
+        self.volume_control.draw()
+        self.screen.blit(self.start_btn_font,
+                         self.start_btn_rect)
+        self.screen.blit(self.quit_btn_font, self.quit_btn_rect)
+        if self.score is not None and self.end_state is not None:
+            self.game_score_draw()
+        if AssetCache.loading:
+            self.loading_draw()
+        self.game_window.viewport.present()
+        self.game_window.profiler.mark_first_frame()
+
+    def loading_draw(self):
+        progress = AssetCache.get_loading_progress(
+            len(AssetPreloader.IMAGE_NAMES) + len(AssetPreloader.SOUND_NAMES))
+        text = TextCache.render(
+            self.font, self.LOADING_TEMPLATE.format(progress), (0, 255, 0))
+        self.screen.blit(text, (0, 0))
+
+    def game_volumes_state(self):
+        return self.volume_control.is_volume_on()
+
+    def close_menu(self):
+        self.screen.fill((0, 0, 0))
+        self.end_state = None
+        self.score = None
+        self.running = False
+
+    def events_handler(self):
+        for event in self.get_events():
+            if event.type == pygame.QUIT:
+                self.close_menu()
+                sys.exit(0)
+            if event.type == pygame.MOUSEMOTION:
+                start_btn_selected = self.start_btn_rect.collidepoint(
+                    *event.pos)
+                quit_btn_selected = self.quit_btn_rect.collidepoint(*event.pos)
+                mute_unmute_btn_selected = self.volume_control.is_point_in(
+                    *event.pos)
+                if start_btn_selected and \
+                        self.selected_btn != self.START_BUTTON:
+                    self.selected_btn = self.START_BUTTON
+                    self.play_btn_selected_effect()
+                if quit_btn_selected and self.selected_btn != self.QUIT_BUTTON:
+                    self.selected_btn = self.QUIT_BUTTON
+                    self.play_btn_selected_effect()
+                if mute_unmute_btn_selected and \
+                        self.selected_btn != self.MUTE_UNMUTE_BUTTON:
+                    self.selected_btn = self.MUTE_UNMUTE_BUTTON
+                    self.play_btn_selected_effect()
+                if not start_btn_selected and \
+                    not quit_btn_selected and \
+                        not mute_unmute_btn_selected:
+                    self.selected_btn = None
+            if event.type == pygame.MOUSEBUTTONUP:
+                if self.start_btn_rect.collidepoint(*event.pos):
+                    self.game_window.start_game()
+                    self.game_window.set_menu(self)
+                    self.score = self.game_window.score.get_score()
+                    self.end_state = self.game_window.simulation.end_state
+                    self.needs_redraw = True
+                elif self.quit_btn_rect.collidepoint(*event.pos):
+                    self.close_menu()
+                    sys.exit(0)
+                elif self.volume_control.is_point_in(*event.pos):
+                    self.volume_control.click_handler()
+
+    def play_btn_selected_effect(self):
+        if self.volume_control.is_volume_on():
+            SoundPool.play(self.BTN_SELECT_SOUND_NAME, SoundPool.UI)
+
+    def game_score_draw(self):
+        text_state = "win" if self.end_state == GameWindow.WIN else "lose"
+        end_text = TextCache.render(
+            self.font, Menu.TEMPLATE.format(text_state, str(self.score)),
+            (0, 255, 0))
+        self.screen.blit(end_text,
+                         (0,
+                          self.height * Menu.Y_INDENT_COEFF))
+
+
+class PauseMenu(Menu):
+    BACKGROUND_NAME = GameWindow.BACKGROUND_NAME
+
+    def __init__(self, width, height, screen, game_window,
+                 volume_control, score=None, end_state=None):
+        Allocations.count("pause_menus")
+        self.font = TextCache.get_font(Score.FONT_SIZE)
+        self.end_state = end_state
+        self.score = score
+        self.width = width
+        self.height = height
+        self.screen = screen
+        self.game_window = game_window
+        self.start_btn_font = AssetCache.get_image("play_button.png")
+        self.start_btn_rect = pygame.Rect((self.width -
+                                           self.start_btn_font.get_width())//2,
+                                          (self.height -
+                                           self.start_btn_font.get_height())//2,
+                                          *self.start_btn_font.get_size())
+        self.quit_btn_font = AssetCache.get_image("quit_button.png")
+        self.quit_btn_rect = pygame.Rect((self.width -
+                                          self.quit_btn_font.get_width())//2,
+                                         (self.height +
+                                          self.quit_btn_font.get_height())//2,
+                                         *self.quit_btn_font.get_size())
+        self.selected_btn = None
+        self.volume_control = volume_control
+
+    def events_handler(self):
+        for event in self.get_events():
+            if event.type == pygame.QUIT:
+                self.close_menu()
+                sys.exit(0)
+            if event.type == pygame.MOUSEMOTION:
+                start_btn_selected = self.start_btn_rect.collidepoint(
+                    *event.pos)
+                quit_btn_selected = self.quit_btn_rect.collidepoint(*event.pos)
+                mute_unmute_btn_selected = self.volume_control.is_point_in(
+                    *event.pos)
+                if start_btn_selected and \
+                        self.selected_btn != self.START_BUTTON:
+                    self.selected_btn = self.START_BUTTON
+                    self.play_btn_selected_effect()
+                if quit_btn_selected and self.selected_btn != self.QUIT_BUTTON:
+                    self.selected_btn = self.QUIT_BUTTON
+                    self.play_btn_selected_effect()
+                if mute_unmute_btn_selected and \
+                        self.selected_btn != self.MUTE_UNMUTE_BUTTON:
+                    self.selected_btn = self.MUTE_UNMUTE_BUTTON
+                    self.play_btn_selected_effect()
+                if not start_btn_selected and \
+                    not quit_btn_selected and \
+                        not mute_unmute_btn_selected:
+                    self.selected_btn = None
+            if event.type == pygame.MOUSEBUTTONUP:
+                if self.start_btn_rect.collidepoint(*event.pos):
+                    self.game_window.pause_handler()
+                    self.screen.fill((0, 0, 0))
+                    self.running = False
+                elif self.quit_btn_rect.collidepoint(*event.pos):
+                    self.close_menu()
+                    sys.exit(0)
+                elif self.volume_control.is_point_in(*event.pos):
+                    self.volume_control.click_handler()
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                self.game_window.pause_handler()
+                self.screen.fill((0, 0, 0))
+                self.running = False
+
+
+class AssetPreloader:
+    IMAGE_NAMES = (Menu.BACKGROUND_NAME, GameWindow.BACKGROUND_NAME,
+                   TextureAtlas.IMAGE_NAME)
+    SOUND_NAMES = (Menu.BTN_SELECT_SOUND_NAME, Block.CRASHED_SOUND_NAME,
+                   ConcreteBlock.HIT_SOUND_NAME, IronBlock.CRASHED_SOUND_NAME,
+                   Paddle.TOUCH_SOUND_NAME, GameWindow.WIN_SOUND_NAME,
+                   GameWindow.LOSE_SOUND_NAME)
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.total = len(self.IMAGE_NAMES) + len(self.SOUND_NAMES)
+        self.loaded = 0
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        AssetCache.loading.update(self.IMAGE_NAMES + self.SOUND_NAMES)
+
+    def start(self):
+        self.thread.start()
+
+    def run(self):
+        for name in self.IMAGE_NAMES:
+            if name not in AssetCache.decoded_images:
+                AssetCache.decoded_images[name] = \
+                    GameWindow.decode_image(name)
+            self.progress(name)
+        for name in self.SOUND_NAMES:
+            if pygame.mixer.get_init() and name not in AssetCache.sounds:
+                AssetCache.sounds[name] = AssetCache.load_sound(name)
+            self.progress(name)
+
+    def progress(self, name):
+        AssetCache.loading.discard(name)
+        self.loaded += 1
+        if self.callback is not None:
+            self.callback(self.loaded, self.total, name)
+
+    @staticmethod
+    def post_progress(loaded, total, name):
+        pygame.event.post(pygame.event.Event(
+            Menu.ASSETS_PROGRESS_EVENT, loaded=loaded, total=total,
+            name=name))
+
+
+def parse_size(text):
+    width, _, height = text.lower().partition("x")
+    try:
+        size = int(width), int(height)
+    except ValueError:
+        size = None
+    if size is None or min(size) < 1:
+        raise argparse.ArgumentTypeError(
+            f"expected WIDTHxHEIGHT such as 1920x1080, got {text!r}")
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profile", metavar="PATH",
+                        help="dump frame timings to a .json or .csv file "
+                             "on exit")
+    parser.add_argument("--record", metavar="PATH",
+                        help="record the inputs of the last game to PATH")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="replay a recorded game headless and exit")
+    parser.add_argument("--level", metavar="PATH",
+                        help="play or replay a text or compiled level file")
+    parser.add_argument("--size", metavar="WIDTHxHEIGHT", type=parse_size,
+                        default="1280x720",
+                        help="window size; the game is scaled from 1280x720 "
+                             "(default: 1280x720)")
+    parser.add_argument("--fullscreen", action="store_true",
+                        help="run fullscreen at the desktop resolution")
+    parser.add_argument("--scale", choices=Viewport.MODES,
+                        default=Viewport.SMOOTH,
+                        help="smooth scaling or faster integer scaling "
+                             "(default: smooth)")
+    parser.add_argument("--pcm-cache", metavar="DIR",
+                        help="cache decoded sounds as raw PCM in DIR")
+    parser.add_argument("--compile-level", nargs=2,
+                        metavar=("SOURCE", "TARGET"),
+                        help="compile a text level to the binary format "
+                             "and exit")
+    parser.add_argument("--build-atlas", action="store_true",
+                        help="pack the block textures into {} and {} in "
+                             "data and exit".format(TextureAtlas.IMAGE_NAME,
+                                                    TextureAtlas.INDEX_NAME))
+    args = parser.parse_args()
+
+    if args.compile_level:
+        Level.compile(*args.compile_level)
+        return
+    if args.build_atlas:
+        TextureAtlas.save()
+        return
+    try:
+        level = Level.load(args.level) if args.level else None
+    except (OSError, ValueError) as error:
+        sys.exit(f"cannot load level '{args.level}': {error}")
+
+    if args.replay:
+        start = time.perf_counter()
+        recording = InputRecording.load(args.replay)
+        try:
+            simulation = recording.replay(level=level)
+        except ValueError as error:
+            sys.exit(f"cannot replay '{args.replay}': {error}")
+        elapsed = time.perf_counter() - start
+        print("ticks: {}, score: {}, lives: {}, end state: {}, "
+              "speed: {:.0f}x real time".format(
+                  simulation.ticks, simulation.score.get_score(),
+                  simulation.balls.get_lifes(), simulation.end_state,
+                  simulation.get_time() / elapsed))
+        return
+
+    AssetCache.pcm_cache_dir = args.pcm_cache
+    profiler = FrameProfiler(GameWindow.FPS)
+    pygame.display.init()
+    pygame.font.init()
+    width, height = 1280, 720
+    if args.fullscreen:
+        screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+    else:
+        screen = pygame.display.set_mode(args.size)
+    viewport = Viewport(screen, (width, height), args.scale)
+    game_wnd = GameWindow(width, height, screen, profiler=profiler,
+                          record_path=args.record, level=level,
+                          viewport=viewport)
+    if args.profile:
+        atexit.register(game_wnd.profiler.dump, args.profile)
+    if args.record:
+        atexit.register(game_wnd.save_recording)
+    preloader = AssetPreloader(AssetPreloader.post_progress)
+    menu = Menu(width, height, viewport.surface, game_wnd)
+    menu.update_menu_loop()
+    pygame.init()
+    preloader.start()
+    menu.draw()
+
+
+if __name__ == "__main__":
     main()
\ No newline at end of file